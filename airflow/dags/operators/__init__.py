@@ -1,9 +1,13 @@
 """Custom Airflow operators for SEC EDGAR pipeline."""
 
 from .bigquery_quality_check import BigQueryDataQualityOperator
-from .looker_refresh import LookerMaterializedViewRefreshOperator
+from .looker_refresh import (
+    LookerMaterializedViewBatchRefreshOperator,
+    LookerMaterializedViewRefreshOperator,
+)
 
 __all__ = [
     "BigQueryDataQualityOperator",
     "LookerMaterializedViewRefreshOperator",
+    "LookerMaterializedViewBatchRefreshOperator",
 ]
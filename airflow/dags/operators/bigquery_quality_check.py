@@ -1,9 +1,12 @@
 """Custom BigQuery Data Quality Check Operator."""
 
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional
 from airflow.models import BaseOperator
-from airflow.providers.google.cloud.hooks.bigquery import BigQueryHook
 from airflow.exceptions import AirflowException
+from google.cloud.bigquery import Client, Row
+
+from .hooks import get_bigquery_client
 
 
 class BigQueryDataQualityOperator(BaseOperator):
@@ -13,11 +16,14 @@ class BigQueryDataQualityOperator(BaseOperator):
     :param project_id: GCP project ID
     :param dataset_id: BigQuery dataset ID
     :param table_id: BigQuery table ID
-    :param quality_checks: List of quality check definitions
+    :param quality_checks: List of quality check definitions, each a ``name``
+        and a ``sql`` query returning a single boolean (templated)
     :param gcp_conn_id: Airflow connection ID for GCP
     """
 
-    template_fields = ("project_id", "dataset_id", "table_id")
+    # quality_checks is rendered too, so check SQL may use Jinja templates;
+    # Airflow renders the strings nested inside its lists and dicts
+    template_fields = ("project_id", "dataset_id", "table_id", "quality_checks")
 
     def __init__(
         self,
@@ -37,47 +43,46 @@ class BigQueryDataQualityOperator(BaseOperator):
 
     def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute data quality checks."""
-        hook = BigQueryHook(gcp_conn_id=self.gcp_conn_id, use_legacy_sql=False)
+        client = get_bigquery_client(self.gcp_conn_id, self.project_id)
 
         self.log.info(
             f"Running {len(self.quality_checks)} quality checks on "
             f"{self.project_id}.{self.dataset_id}.{self.table_id}"
         )
 
+        try:
+            # One job for every check avoids paying BigQuery's per-query
+            # scheduling overhead once per check
+            outcomes = self._run_batched(client)
+        except Exception as e:
+            self.log.warning(
+                f"Batched quality check query failed ({str(e)}), "
+                f"re-running checks individually"
+            )
+            outcomes = self._run_concurrently(client)
+
         results = {}
         failed_checks = []
 
         for check in self.quality_checks:
             check_name = check["name"]
-            check_sql = check["sql"]
-
-            self.log.info(f"Executing quality check: {check_name}")
-
-            try:
-                # Run the check query
-                records = hook.get_pandas_df(sql=check_sql)
-
-                if records.empty:
-                    self.log.error(f"Quality check '{check_name}' returned no results")
-                    failed_checks.append(check_name)
-                    results[check_name] = {"passed": False, "error": "No results returned"}
-                    continue
-
-                # Get the first column of the first row (should be a boolean)
-                result = records.iloc[0, 0]
-
-                if result:
-                    self.log.info(f"✅ Quality check '{check_name}' PASSED")
-                    results[check_name] = {"passed": True}
-                else:
-                    self.log.error(f"❌ Quality check '{check_name}' FAILED")
-                    failed_checks.append(check_name)
-                    results[check_name] = {"passed": False, "error": "Check condition not met"}
+            outcome = outcomes.get(check_name)
 
-            except Exception as e:
-                self.log.error(f"Error executing quality check '{check_name}': {str(e)}")
+            if isinstance(outcome, Exception):
+                self.log.error(f"Error executing quality check '{check_name}': {str(outcome)}")
                 failed_checks.append(check_name)
-                results[check_name] = {"passed": False, "error": str(e)}
+                results[check_name] = {"passed": False, "error": str(outcome)}
+            elif outcome is None:
+                self.log.error(f"Quality check '{check_name}' returned no results")
+                failed_checks.append(check_name)
+                results[check_name] = {"passed": False, "error": "No results returned"}
+            elif outcome:
+                self.log.info(f"✅ Quality check '{check_name}' PASSED")
+                results[check_name] = {"passed": True}
+            else:
+                self.log.error(f"❌ Quality check '{check_name}' FAILED")
+                failed_checks.append(check_name)
+                results[check_name] = {"passed": False, "error": "Check condition not met"}
 
         # Summary
         total_checks = len(self.quality_checks)
@@ -95,3 +100,65 @@ class BigQueryDataQualityOperator(BaseOperator):
             raise AirflowException(error_msg)
 
         return results
+
+    def _run_batched(self, client: Client) -> Dict[str, Any]:
+        """Run all checks as a single UNION ALL query.
+
+        Each check SQL must be a query returning a single boolean value; it is
+        embedded as a scalar subquery, so an empty result surfaces as NULL.
+
+        Returns:
+            Mapping of check name to the boolean returned by its query
+        """
+        combined_sql = "\nUNION ALL\n".join(
+            f"SELECT {index} AS check_index, ({check['sql'].strip().rstrip(';')}) AS passed"
+            for index, check in enumerate(self.quality_checks)
+        )
+
+        self.log.info(f"Executing {len(self.quality_checks)} quality checks as one query")
+        rows = client.query(combined_sql).result()
+
+        return {
+            self.quality_checks[row["check_index"]]["name"]: row["passed"]
+            for row in rows
+        }
+
+    def _run_concurrently(self, client: Client) -> Dict[str, Any]:
+        """Run each check as its own query, submitting them all at once.
+
+        Used when the batched query fails, so a single broken check can be
+        told apart from the rest.
+
+        Returns:
+            Mapping of check name to its boolean result, or the exception raised
+        """
+        outcomes: Dict[str, Any] = {}
+
+        # The underlying client is safe to share across threads
+        max_workers = max(1, min(16, len(self.quality_checks)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for check in self.quality_checks:
+                self.log.info(f"Executing quality check: {check['name']}")
+                future = executor.submit(self._fetch_first_row, client, check["sql"])
+                futures[future] = check["name"]
+
+            for future in as_completed(futures):
+                check_name = futures[future]
+                try:
+                    row = future.result()
+                    outcomes[check_name] = row[0] if row is not None else None
+                except Exception as e:
+                    outcomes[check_name] = e
+
+        return outcomes
+
+    @staticmethod
+    def _fetch_first_row(client: Client, sql: str) -> Optional[Row]:
+        """Run a check query and return its first row, or None if it is empty.
+
+        Reads the result rows directly rather than building a DataFrame, since
+        each check only yields a single boolean.
+        """
+        rows = client.query(sql).result(max_results=1)
+        return next(iter(rows), None)
@@ -0,0 +1,36 @@
+"""Shared BigQuery hook and client cache for the custom operators."""
+
+from functools import lru_cache
+
+from airflow.providers.google.cloud.hooks.bigquery import BigQueryHook
+from google.cloud.bigquery import Client
+
+
+@lru_cache(maxsize=4)
+def get_bigquery_hook(gcp_conn_id: str) -> BigQueryHook:
+    """Return a BigQueryHook shared by all tasks in this worker process.
+
+    Args:
+        gcp_conn_id: Airflow connection ID for GCP
+
+    Returns:
+        Cached BigQueryHook for the connection
+    """
+    return BigQueryHook(gcp_conn_id=gcp_conn_id, use_legacy_sql=False)
+
+
+@lru_cache(maxsize=4)
+def get_bigquery_client(gcp_conn_id: str, project_id: str) -> Client:
+    """Return a BigQuery client shared by all tasks in this worker process.
+
+    Building a client re-reads credentials and opens a new connection, so it
+    is reused across operator executions instead.
+
+    Args:
+        gcp_conn_id: Airflow connection ID for GCP
+        project_id: GCP project ID to run jobs in
+
+    Returns:
+        Cached BigQuery client for the connection and project
+    """
+    return get_bigquery_hook(gcp_conn_id).get_client(project_id=project_id)
@@ -1,28 +1,116 @@
 """Custom Operator to Refresh BigQuery Materialized Views."""
 
-from typing import Dict, Any
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional
 from airflow.models import BaseOperator
-from airflow.providers.google.cloud.hooks.bigquery import BigQueryHook
 from airflow.exceptions import AirflowException
 
+from google.cloud.bigquery import Client
+
+from .hooks import get_bigquery_client, get_bigquery_hook
+
+
+def find_stale_views(
+    client: Client,
+    project_id: str,
+    dataset_id: str,
+    location: str,
+    views: List[str],
+    base_tables: Dict[str, List[str]],
+    max_staleness: timedelta,
+) -> List[str]:
+    """Return the materialized views whose refresh cannot be skipped.
+
+    A view is fresh when its last refresh is within ``max_staleness`` and none
+    of its base tables has been modified since. A view without base tables is
+    never fresh, and a view whose base is another view being refreshed in the
+    same pass is stale too. The refresh times and base table modification
+    times are read with a single query.
+
+    Args:
+        client: BigQuery client
+        project_id: GCP project ID
+        dataset_id: Dataset holding the views
+        location: BigQuery location, used to query storage metadata
+        views: Materialized view IDs, in refresh order
+        base_tables: Tables each view reads from, as ``dataset.table``
+        max_staleness: How old the last refresh may be before it is repeated
+
+    Returns:
+        Stale view IDs, in the order given
+    """
+    view_names = ", ".join(f"'{view_id}'" for view_id in views)
+    tables = sorted({table for view_id in views for table in base_tables.get(view_id, [])})
+
+    freshness_sql = f"""
+    SELECT 'view' AS kind, table_name AS table_id, last_refresh_time AS modified_time
+    FROM `{project_id}.{dataset_id}.INFORMATION_SCHEMA.MATERIALIZED_VIEWS`
+    WHERE table_name IN ({view_names})
+    """
+    if tables:
+        table_names = ", ".join(f"'{table}'" for table in tables)
+        freshness_sql += f"""
+    UNION ALL
+    SELECT 'base', CONCAT(table_schema, '.', table_name), storage_last_modified_time
+    FROM `{project_id}.region-{location}.INFORMATION_SCHEMA.TABLE_STORAGE`
+    WHERE CONCAT(table_schema, '.', table_name) IN ({table_names})
+    """
+
+    last_refreshed = {}
+    last_modified = {}
+    for row in client.query(freshness_sql).result():
+        times = last_refreshed if row["kind"] == "view" else last_modified
+        times[row["table_id"]] = row["modified_time"]
+
+    now = datetime.now(timezone.utc)
+    stale = []
+    for view_id in views:
+        inputs = base_tables.get(view_id, [])
+        last_refresh = last_refreshed.get(view_id)
+
+        if (
+            not inputs
+            or last_refresh is None
+            or now - last_refresh >= max_staleness
+            or any(f"{dataset_id}.{stale_id}" in inputs for stale_id in stale)
+            or any(
+                last_modified.get(table) is None or last_modified[table] > last_refresh
+                for table in inputs
+            )
+        ):
+            stale.append(view_id)
+
+    return stale
+
 
 class LookerMaterializedViewRefreshOperator(BaseOperator):
     """
     Refresh a BigQuery materialized view.
 
+    The refresh is skipped when the view was refreshed within ``max_staleness``
+    and none of its ``base_tables`` have been modified since.
+
     :param project_id: GCP project ID
     :param dataset_id: BigQuery dataset ID
     :param view_id: Materialized view ID to refresh
+    :param location: BigQuery location of the dataset, used to query storage metadata
+    :param base_tables: Tables the view reads from, as ``dataset.table``
+    :param max_staleness: How old the last refresh may be before it is repeated
+    :param skip_if_fresh: Skip the refresh when the view is already up to date
     :param gcp_conn_id: Airflow connection ID for GCP
     """
 
-    template_fields = ("project_id", "dataset_id", "view_id")
+    template_fields = ("project_id", "dataset_id", "view_id", "location")
 
     def __init__(
         self,
         project_id: str,
         dataset_id: str,
         view_id: str,
+        location: str = "us-central1",
+        base_tables: Optional[List[str]] = None,
+        max_staleness: timedelta = timedelta(hours=1),
+        skip_if_fresh: bool = True,
         gcp_conn_id: str = "google_cloud_default",
         **kwargs
     ):
@@ -30,14 +118,27 @@ class LookerMaterializedViewRefreshOperator(BaseOperator):
         self.project_id = project_id
         self.dataset_id = dataset_id
         self.view_id = view_id
+        self.location = location
+        self.base_tables = base_tables or []
+        self.max_staleness = max_staleness
+        self.skip_if_fresh = skip_if_fresh
         self.gcp_conn_id = gcp_conn_id
 
     def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Refresh the materialized view."""
-        hook = BigQueryHook(gcp_conn_id=self.gcp_conn_id, use_legacy_sql=False)
+        hook = get_bigquery_hook(self.gcp_conn_id)
+
+        client = get_bigquery_client(self.gcp_conn_id, self.project_id)
 
         full_view_id = f"{self.project_id}.{self.dataset_id}.{self.view_id}"
 
+        if self.skip_if_fresh and self._is_fresh(client):
+            self.log.info(f"Skipping refresh, {full_view_id} is already up to date")
+            return {
+                "view_id": full_view_id,
+                "refresh_status": "skipped"
+            }
+
         self.log.info(f"Refreshing materialized view: {full_view_id}")
 
         refresh_sql = f"""
@@ -53,30 +154,33 @@ class LookerMaterializedViewRefreshOperator(BaseOperator):
 
             self.log.info(f"✅ Successfully refreshed {full_view_id}")
 
-            # Get view metadata to confirm refresh
+            # Get view metadata to confirm refresh. TABLE_STORAGE filters on
+            # table_name server-side, unlike the legacy __TABLES__ meta-table.
             view_info_sql = f"""
             SELECT
                 table_name,
-                last_modified_time,
-                row_count,
-                size_bytes
-            FROM `{self.project_id}.{self.dataset_id}.__TABLES__`
-            WHERE table_id = '{self.view_id}'
+                storage_last_modified_time AS last_modified_time,
+                total_rows AS row_count,
+                total_logical_bytes AS size_bytes
+            FROM `{self.project_id}.region-{self.location}.INFORMATION_SCHEMA.TABLE_STORAGE`
+            WHERE table_schema = '{self.dataset_id}'
+                AND table_name = '{self.view_id}'
             """
 
-            view_info = hook.get_pandas_df(sql=view_info_sql)
+            # Single metadata row, so read it directly instead of via a DataFrame
+            view_info = next(iter(client.query(view_info_sql).result(max_results=1)), None)
 
-            if not view_info.empty:
+            if view_info is not None:
                 self.log.info(f"View metadata:")
-                self.log.info(f"  - Last modified: {view_info.iloc[0]['last_modified_time']}")
-                self.log.info(f"  - Row count: {view_info.iloc[0]['row_count']}")
-                self.log.info(f"  - Size (bytes): {view_info.iloc[0]['size_bytes']}")
+                self.log.info(f"  - Last modified: {view_info['last_modified_time']}")
+                self.log.info(f"  - Row count: {view_info['row_count']}")
+                self.log.info(f"  - Size (bytes): {view_info['size_bytes']}")
 
                 return {
                     "view_id": full_view_id,
-                    "last_modified": str(view_info.iloc[0]['last_modified_time']),
-                    "row_count": int(view_info.iloc[0]['row_count']),
-                    "size_bytes": int(view_info.iloc[0]['size_bytes']),
+                    "last_modified": str(view_info['last_modified_time']),
+                    "row_count": int(view_info['row_count']),
+                    "size_bytes": int(view_info['size_bytes']),
                     "refresh_status": "success"
                 }
 
@@ -88,3 +192,159 @@ class LookerMaterializedViewRefreshOperator(BaseOperator):
         except Exception as e:
             self.log.error(f"Failed to refresh materialized view {full_view_id}: {str(e)}")
             raise AirflowException(f"Materialized view refresh failed: {str(e)}")
+
+    def _is_fresh(self, client: Client) -> bool:
+        """Check whether the view can skip this refresh.
+
+        A view is fresh when its last refresh is within ``max_staleness`` and no
+        base table has been modified since. Without ``base_tables`` there is no
+        way to tell whether the inputs changed, so the view is never fresh.
+
+        Args:
+            client: BigQuery client
+
+        Returns:
+            True if the refresh can be skipped
+        """
+        if not self.base_tables:
+            return False
+
+        try:
+            stale = find_stale_views(
+                client,
+                self.project_id,
+                self.dataset_id,
+                self.location,
+                [self.view_id],
+                {self.view_id: self.base_tables},
+                self.max_staleness,
+            )
+        except Exception as e:
+            self.log.warning(f"Could not check view freshness, refreshing anyway: {str(e)}")
+            return False
+
+        return not stale
+
+
+class LookerMaterializedViewBatchRefreshOperator(BaseOperator):
+    """
+    Refresh several BigQuery materialized views in a single script job.
+
+    Views are refreshed in the order given, so views built on top of other
+    views should be listed after them. Views that were refreshed within
+    ``max_staleness`` and whose ``base_tables`` have not been modified since
+    are left out of the script, and no job runs when every view is fresh.
+
+    :param project_id: GCP project ID
+    :param dataset_id: BigQuery dataset ID
+    :param views: Materialized view IDs to refresh
+    :param location: BigQuery location of the dataset, used to query storage metadata
+    :param base_tables: Tables each view reads from, as ``dataset.table``, keyed by view ID
+    :param max_staleness: How old a view's last refresh may be before it is repeated
+    :param skip_if_fresh: Skip views that are already up to date
+    :param gcp_conn_id: Airflow connection ID for GCP
+    """
+
+    template_fields = ("project_id", "dataset_id", "views", "location")
+
+    def __init__(
+        self,
+        project_id: str,
+        dataset_id: str,
+        views: List[str],
+        location: str = "us-central1",
+        base_tables: Optional[Dict[str, List[str]]] = None,
+        max_staleness: timedelta = timedelta(hours=1),
+        skip_if_fresh: bool = True,
+        gcp_conn_id: str = "google_cloud_default",
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.project_id = project_id
+        self.dataset_id = dataset_id
+        self.views = views
+        self.location = location
+        self.base_tables = base_tables or {}
+        self.max_staleness = max_staleness
+        self.skip_if_fresh = skip_if_fresh
+        self.gcp_conn_id = gcp_conn_id
+
+    def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Refresh all materialized views."""
+        client = get_bigquery_client(self.gcp_conn_id, self.project_id)
+
+        refresh_views = list(self.views)
+        if self.skip_if_fresh and self.base_tables:
+            try:
+                refresh_views = find_stale_views(
+                    client,
+                    self.project_id,
+                    self.dataset_id,
+                    self.location,
+                    refresh_views,
+                    self.base_tables,
+                    self.max_staleness,
+                )
+            except Exception as e:
+                self.log.warning(f"Could not check view freshness, refreshing all: {str(e)}")
+
+        if not refresh_views:
+            self.log.info("Skipping refresh, all materialized views are already up to date")
+            return {
+                "views": [],
+                "refresh_status": "skipped"
+            }
+
+        full_view_ids = [
+            f"{self.project_id}.{self.dataset_id}.{view_id}" for view_id in refresh_views
+        ]
+
+        self.log.info(f"Refreshing {len(full_view_ids)} materialized views: {', '.join(full_view_ids)}")
+
+        # One multi-statement job instead of a job per view
+        refresh_script = "\n".join(
+            f"CALL BQ.REFRESH_MATERIALIZED_VIEW('{full_view_id}');"
+            for full_view_id in full_view_ids
+        )
+
+        try:
+            client.query(refresh_script).result()
+
+            self.log.info(f"✅ Successfully refreshed {len(full_view_ids)} views")
+
+            view_names = ", ".join(f"'{view_id}'" for view_id in refresh_views)
+            view_info_sql = f"""
+            SELECT
+                table_name,
+                storage_last_modified_time AS last_modified_time,
+                total_rows AS row_count,
+                total_logical_bytes AS size_bytes
+            FROM `{self.project_id}.region-{self.location}.INFORMATION_SCHEMA.TABLE_STORAGE`
+            WHERE table_schema = '{self.dataset_id}'
+                AND table_name IN ({view_names})
+            """
+
+            views = []
+            for view_info in client.query(view_info_sql).result():
+                full_view_id = f"{self.project_id}.{self.dataset_id}.{view_info['table_name']}"
+
+                self.log.info(f"View metadata for {full_view_id}:")
+                self.log.info(f"  - Last modified: {view_info['last_modified_time']}")
+                self.log.info(f"  - Row count: {view_info['row_count']}")
+                self.log.info(f"  - Size (bytes): {view_info['size_bytes']}")
+
+                views.append({
+                    "view_id": full_view_id,
+                    "last_modified": str(view_info['last_modified_time']),
+                    "row_count": int(view_info['row_count']),
+                    "size_bytes": int(view_info['size_bytes']),
+                })
+
+            return {
+                "views": views,
+                "refresh_status": "success"
+            }
+
+        except Exception as e:
+            self.log.error(f"Failed to refresh materialized views: {str(e)}")
+            raise AirflowException(f"Materialized view refresh failed: {str(e)}")
@@ -12,27 +12,24 @@ This DAG orchestrates the complete SEC EDGAR data processing pipeline:
 Schedule: Daily at 2 AM EST
 """
 
+import os
 from datetime import datetime, timedelta
 from typing import Dict, Any
 
 from airflow import DAG
 from airflow.operators.python import PythonOperator
-from airflow.providers.google.cloud.operators.functions import CloudFunctionsInvokeFunctionOperator
+from airflow.providers.google.cloud.operators.functions import CloudFunctionInvokeFunctionOperator
 from airflow.providers.google.cloud.operators.dataproc import DataprocCreateBatchOperator
-from airflow.providers.google.cloud.operators.bigquery import (
-    BigQueryCheckOperator,
-    BigQueryExecuteQueryOperator,
-)
+from airflow.providers.google.cloud.operators.bigquery import BigQueryExecuteQueryOperator
 from airflow.providers.google.cloud.sensors.gcs import GCSObjectExistenceSensor
 from airflow.operators.email import EmailOperator
 from airflow.utils.task_group import TaskGroup
 
-# Import custom operators
-import sys
-import os
-sys.path.insert(0, os.path.dirname(__file__))
-from operators.bigquery_quality_check import BigQueryDataQualityOperator
-from operators.looker_refresh import LookerMaterializedViewRefreshOperator
+# Import custom operators (Airflow puts the DAGs folder on sys.path)
+from operators import (
+    BigQueryDataQualityOperator,
+    LookerMaterializedViewBatchRefreshOperator,
+)
 
 
 # Configuration
@@ -45,6 +42,11 @@ BRONZE_DATASET = "bronze_sec"
 SILVER_DATASET = "silver_sec"
 GOLD_DATASET = "gold_sec"
 NOTIFICATION_EMAIL = "{{ var.value.notification_email }}"
+BIGQUERY_POOL = "bigquery_refresh"
+
+# Same year check_sec_updates reports, rendered from the template context
+# rather than pulled from XCom by every task that needs it
+EXECUTION_YEAR = "{{ data_interval_start.year }}"
 
 # Default DAG arguments
 default_args = {
@@ -63,21 +65,21 @@ def check_sec_updates(**context) -> Dict[str, Any]:
     """Check if new SEC data is available.
 
     In production, this would check SEC's update timestamps.
-    For now, returns current execution date.
+    For now, returns the start of the run's data interval.
     """
-    execution_date = context["execution_date"]
+    data_interval_start = context["data_interval_start"]
 
     return {
         "has_updates": True,
-        "execution_year": execution_date.year,
-        "execution_date": execution_date.strftime("%Y-%m-%d"),
+        "execution_year": data_interval_start.year,
+        "execution_date": data_interval_start.strftime("%Y-%m-%d"),
     }
 
 
 def generate_batch_id(**context) -> str:
     """Generate unique Dataproc batch ID."""
-    execution_date = context["execution_date"]
-    return f"{DATAPROC_BATCH_ID_PREFIX}-{execution_date.strftime('%Y%m%d-%H%M%S')}"
+    logical_date = context["logical_date"]
+    return f"{DATAPROC_BATCH_ID_PREFIX}-{logical_date.strftime('%Y%m%d-%H%M%S')}"
 
 
 # Create the DAG
@@ -89,6 +91,8 @@ with DAG(
     start_date=datetime(2024, 1, 1),
     catchup=False,
     max_active_runs=1,
+    max_active_tasks=16,
+    template_searchpath=[os.path.join(os.path.dirname(__file__), "templates")],
     tags=["sec", "edgar", "financial-data", "production"],
 ) as dag:
 
@@ -103,44 +107,47 @@ with DAG(
     with TaskGroup("data_ingestion", tooltip="Download SEC bulk data files") as ingestion_group:
 
         # Invoke Cloud Function to download companyfacts.zip
-        download_companyfacts = CloudFunctionsInvokeFunctionOperator(
+        download_companyfacts = CloudFunctionInvokeFunctionOperator(
             task_id="download_companyfacts",
-            function_name="sec-data-ingestion",
+            function_id="sec-data-ingestion",
             location=REGION,
             project_id=PROJECT_ID,
             input_data={
                 "file_types": ["companyfacts"],
-                "year": "{{ ti.xcom_pull(task_ids='check_sec_updates')['execution_year'] }}"
+                "year": EXECUTION_YEAR
             },
         )
 
         # Invoke Cloud Function to download submissions.zip
-        download_submissions = CloudFunctionsInvokeFunctionOperator(
+        download_submissions = CloudFunctionInvokeFunctionOperator(
             task_id="download_submissions",
-            function_name="sec-data-ingestion",
+            function_id="sec-data-ingestion",
             location=REGION,
             project_id=PROJECT_ID,
             input_data={
                 "file_types": ["submissions"],
-                "year": "{{ ti.xcom_pull(task_ids='check_sec_updates')['execution_year'] }}"
+                "year": EXECUTION_YEAR
             },
         )
 
-        # Verify files were uploaded to GCS
+        # Verify files were uploaded to GCS; deferred sensors wait in the
+        # triggerer instead of holding a worker slot
         verify_companyfacts = GCSObjectExistenceSensor(
             task_id="verify_companyfacts_uploaded",
             bucket=RAW_BUCKET,
-            object="bulk/{{ ti.xcom_pull(task_ids='check_sec_updates')['execution_year'] }}/companyfacts.zip",
+            object=f"bulk/{EXECUTION_YEAR}/companyfacts.zip",
             timeout=600,
             poke_interval=30,
+            deferrable=True,
         )
 
         verify_submissions = GCSObjectExistenceSensor(
             task_id="verify_submissions_uploaded",
             bucket=RAW_BUCKET,
-            object="bulk/{{ ti.xcom_pull(task_ids='check_sec_updates')['execution_year'] }}/submissions.zip",
+            object=f"bulk/{EXECUTION_YEAR}/submissions.zip",
             timeout=600,
             poke_interval=30,
+            deferrable=True,
         )
 
         download_companyfacts >> verify_companyfacts
@@ -159,7 +166,7 @@ with DAG(
                 "pyspark_batch": {
                     "main_python_file_uri": f"gs://{PROCESSED_BUCKET}/spark-jobs/parse_xbrl.py",
                     "args": [
-                        f"gs://{RAW_BUCKET}/bulk/{{{{ ti.xcom_pull(task_ids='check_sec_updates')['execution_year'] }}}}/companyfacts.zip",
+                        f"gs://{RAW_BUCKET}/bulk/{EXECUTION_YEAR}/companyfacts.zip",
                         BRONZE_DATASET,
                     ],
                     "jar_file_uris": [
@@ -233,122 +240,66 @@ with DAG(
     # Task 4: Data Quality Validation
     with TaskGroup("data_quality", tooltip="Validate data quality") as quality_group:
 
-        # Check row counts
-        check_companies_count = BigQueryCheckOperator(
-            task_id="check_companies_count",
-            sql=f"""
-                SELECT COUNT(*) >= 100
-                FROM `{PROJECT_ID}.{SILVER_DATASET}.dim_companies`
-            """,
-            use_legacy_sql=False,
-        )
-
-        check_financials_count = BigQueryCheckOperator(
-            task_id="check_financials_count",
-            sql=f"""
-                SELECT COUNT(*) >= 1000
-                FROM `{PROJECT_ID}.{SILVER_DATASET}.fact_financials`
-            """,
-            use_legacy_sql=False,
-        )
-
-        # Custom data quality checks
+        # The fact checks (row count, nulls, fiscal years, quality pass rate)
+        # run inside the create_facts Spark job before it writes; only the
+        # dimension row count is left to check here, from storage metadata
         quality_checks = BigQueryDataQualityOperator(
             task_id="run_data_quality_checks",
             project_id=PROJECT_ID,
             dataset_id=SILVER_DATASET,
-            table_id="fact_financials",
+            table_id="dim_companies",
+            pool=BIGQUERY_POOL,
             quality_checks=[
                 {
-                    "name": "null_check_critical_fields",
-                    "sql": f"""
-                        SELECT COUNT(*) = 0
-                        FROM `{PROJECT_ID}.{SILVER_DATASET}.fact_financials`
-                        WHERE cik IS NULL OR concept IS NULL OR value IS NULL
-                    """,
-                },
-                {
-                    "name": "valid_fiscal_years",
-                    "sql": f"""
-                        SELECT COUNT(*) = 0
-                        FROM `{PROJECT_ID}.{SILVER_DATASET}.fact_financials`
-                        WHERE fiscal_year < 2000 OR fiscal_year > 2030
-                    """,
-                },
-                {
-                    "name": "data_quality_flag_check",
+                    "name": "companies_count",
                     "sql": f"""
-                        SELECT SUM(CASE WHEN data_quality_passed THEN 1 ELSE 0 END) * 100.0 / COUNT(*) >= 95
-                        FROM `{PROJECT_ID}.{BRONZE_DATASET}.raw_financials`
+                        SELECT (
+                            SELECT total_rows
+                            FROM `{PROJECT_ID}.region-{REGION}.INFORMATION_SCHEMA.TABLE_STORAGE`
+                            WHERE table_schema = '{SILVER_DATASET}' AND table_name = 'dim_companies'
+                        ) >= 100
                     """,
                 },
             ],
         )
 
-        [check_companies_count, check_financials_count] >> quality_checks
-
     # Task 5: Refresh Looker Materialized Views
     with TaskGroup("refresh_looker_views", tooltip="Refresh analytics views") as looker_group:
 
-        refresh_company_metrics = LookerMaterializedViewRefreshOperator(
-            task_id="refresh_company_metrics",
-            project_id=PROJECT_ID,
-            dataset_id=GOLD_DATASET,
-            view_id="looker_company_metrics",
-        )
-
-        refresh_financial_ratios = LookerMaterializedViewRefreshOperator(
-            task_id="refresh_financial_ratios",
-            project_id=PROJECT_ID,
-            dataset_id=GOLD_DATASET,
-            view_id="looker_financial_ratios",
-        )
-
-        refresh_peer_comparison = LookerMaterializedViewRefreshOperator(
-            task_id="refresh_peer_comparison",
+        # Refresh all views in one BigQuery script job; ratios and timeseries
+        # read from company metrics, so it is refreshed first
+        refresh_views = LookerMaterializedViewBatchRefreshOperator(
+            task_id="refresh_materialized_views",
             project_id=PROJECT_ID,
             dataset_id=GOLD_DATASET,
-            view_id="looker_peer_comparison",
-        )
-
-        refresh_timeseries = LookerMaterializedViewRefreshOperator(
-            task_id="refresh_timeseries",
-            project_id=PROJECT_ID,
-            dataset_id=GOLD_DATASET,
-            view_id="looker_timeseries",
+            views=[
+                "looker_company_metrics",
+                "looker_financial_ratios",
+                "looker_peer_comparison",
+                "looker_timeseries",
+            ],
+            location=REGION,
+            # Views whose inputs are unchanged since their last refresh are skipped
+            base_tables={
+                "looker_company_metrics": [
+                    f"{SILVER_DATASET}.fact_financials",
+                    f"{SILVER_DATASET}.dim_companies",
+                ],
+                "looker_financial_ratios": [f"{GOLD_DATASET}.looker_company_metrics"],
+                "looker_peer_comparison": [f"{GOLD_DATASET}.looker_financial_ratios"],
+                "looker_timeseries": [f"{GOLD_DATASET}.looker_company_metrics"],
+            },
+            pool=BIGQUERY_POOL,
+            priority_weight=10,
         )
 
-        # All refreshes can run in parallel
-        [refresh_company_metrics, refresh_financial_ratios,
-         refresh_peer_comparison, refresh_timeseries]
-
     # Task 6: Send Success Notification
     send_success_notification = EmailOperator(
         task_id="send_success_notification",
         to=[NOTIFICATION_EMAIL],
         subject="✅ SEC EDGAR Pipeline Completed - {{ ds }}",
-        html_content="""
-        <h3>SEC EDGAR Data Pipeline Completed Successfully</h3>
-        <p><strong>Execution Date:</strong> {{ ds }}</p>
-        <p><strong>Execution Time:</strong> {{ execution_date }}</p>
-
-        <h4>Pipeline Steps Completed:</h4>
-        <ul>
-            <li>✅ SEC data ingestion</li>
-            <li>✅ XBRL data processing</li>
-            <li>✅ Dimension and fact table creation</li>
-            <li>✅ Data quality validation</li>
-            <li>✅ Looker materialized view refresh</li>
-        </ul>
-
-        <p><strong>Next Steps:</strong></p>
-        <ul>
-            <li>Review data in BigQuery datasets</li>
-            <li>Check Looker dashboards for updated metrics</li>
-        </ul>
-
-        <p><em>Automated notification from Airflow DAG: sec_edgar_pipeline</em></p>
-        """,
+        # Rendered from templates/ at execution time
+        html_content="success_email.html",
     )
 
     # Generate batch ID task
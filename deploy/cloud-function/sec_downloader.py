@@ -1,17 +1,31 @@
 """SEC data downloader with rate limiting and error handling."""
 
+import hashlib
 import logging
+import random
+import socket
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
 from typing import Optional, Dict, Any
 from pathlib import Path
 
 import requests
+from google.api_core import exceptions as google_exceptions
+from google.api_core.client_info import ClientInfo
 from google.cloud import storage
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.exceptions import HTTPError as URLLib3HTTPError
+from urllib3.util.retry import Retry
 from tenacity import (
+    RetryCallState,
+    before_sleep_log,
     retry,
+    retry_if_exception,
     stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
+    wait_random_exponential,
 )
 
 from config import SECConfig, StorageConfig
@@ -20,24 +34,193 @@ from rate_limiter import RateLimiter
 
 logger = logging.getLogger(__name__)
 
+# Resumable upload chunk sizes for streamed downloads (multiples of 256 KiB)
+CHUNK_SIZE_MULTIPLE = 256 << 10
+STREAM_CHUNK_SIZE = 8 << 20
+LARGE_FILE_CHUNK_SIZE = 32 << 20
+
+SMALL_FILE_BYTES = 16 << 20
+LARGE_FILE_BYTES = 64 << 20
+
+# Read size for buffered (non-streamed) downloads
+READ_CHUNK_SIZE = 1 << 20
+
+# TCP keep-alive so idle pooled connections to www.sec.gov survive the gap
+# between bulk downloads; the interval options are Linux-specific
+KEEPALIVE_SOCKET_OPTIONS = HTTPConnection.default_socket_options + [
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+] + [
+    (socket.IPPROTO_TCP, getattr(socket, name), value)
+    for name, value in (("TCP_KEEPIDLE", 30), ("TCP_KEEPINTVL", 10))
+    if hasattr(socket, name)
+]
+
+# Back-off after HTTP 429 when the server sends no usable Retry-After
+DEFAULT_RETRY_AFTER_SECONDS = 10.0
+
 
 class SECDownloadError(Exception):
     """Custom exception for SEC download errors."""
-    pass
+
+    def __init__(
+        self,
+        message: str,
+        retryable: bool = True,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """Initialize the error.
+
+        Args:
+            message: Error description
+            retryable: Whether repeating the request could succeed
+            retry_after: Seconds the server asked us to wait before retrying
+        """
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Return whether a failed download should be retried.
+
+    Rate limiting, server errors and connection failures are transient;
+    any other 4xx response will fail the same way again. A streamed upload
+    reads the socket through urllib3 directly, so a connection dropped
+    mid-stream surfaces as a urllib3 or socket error, and GCS failing the
+    upload as a Google API error, rather than as a requests exception.
+    """
+    if isinstance(exc, SECDownloadError):
+        return exc.retryable
+    return isinstance(exc, (
+        requests.RequestException,
+        URLLib3HTTPError,
+        ConnectionError,
+        google_exceptions.TooManyRequests,
+        google_exceptions.ServerError,
+    ))
+
+
+# Decorrelated, randomized backoff so concurrent downloads that fail together
+# do not retry in lockstep
+_wait_random_exponential = wait_random_exponential(multiplier=1, max=60)
+
+
+def _wait_before_retry(retry_state: RetryCallState) -> float:
+    """Return how long to wait before the next download attempt.
+
+    Rate-limited requests wait as long as the server asked, with jitter so
+    concurrent downloads do not retry in lockstep; any other failure backs
+    off randomly and exponentially.
+    """
+    exc = retry_state.outcome.exception() if retry_state.outcome else None
+    if isinstance(exc, SECDownloadError) and exc.retry_after is not None:
+        return exc.retry_after * (1 + random.random() * 0.5)
+    return _wait_random_exponential(retry_state)
+
+
+_retry_download = retry(
+    stop=stop_after_attempt(5),
+    wait=_wait_before_retry,
+    retry=retry_if_exception(_is_retryable),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True,
+)
+
+
+@lru_cache(maxsize=8)
+def _get_storage_client(project_id: str) -> storage.Client:
+    """Return a GCS client shared by all downloaders in this process.
+
+    Building a client re-reads credentials and opens a new connection pool,
+    so it is reused across downloader instances instead.
+
+    Args:
+        project_id: GCP project ID
+
+    Returns:
+        Cached storage client for the project
+    """
+    return storage.Client(
+        project=project_id,
+        client_info=ClientInfo(user_agent="sec-edgar-analytics/1.0"),
+    )
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled connections enable TCP keep-alive."""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        """Create the pool manager with keep-alive socket options."""
+        kwargs.setdefault("socket_options", KEEPALIVE_SOCKET_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
+
+
+def current_run_ts() -> str:
+    """Return the current time as epoch seconds, for download metadata."""
+    return str(time.time_ns() // 1_000_000_000)
+
+
+def upload_chunk_size(content_length: Optional[int]) -> int:
+    """Pick a resumable upload chunk size for a download of known length.
+
+    Each chunk is buffered in full before it is sent, so small files get a
+    buffer just large enough to hold them, while multi-GB files use larger
+    chunks to cut the number of upload requests.
+
+    Args:
+        content_length: Download size in bytes, if the server reported it
+
+    Returns:
+        Chunk size in bytes, always a multiple of 256 KiB
+    """
+    if content_length is None:
+        return STREAM_CHUNK_SIZE
+    if content_length < SMALL_FILE_BYTES:
+        return (content_length // CHUNK_SIZE_MULTIPLE + 1) * CHUNK_SIZE_MULTIPLE
+    if content_length > LARGE_FILE_BYTES:
+        return LARGE_FILE_CHUNK_SIZE
+    return STREAM_CHUNK_SIZE
+
+
+def retry_after_seconds(retry_after: Optional[str]) -> float:
+    """Parse a Retry-After header into a delay in seconds.
+
+    Args:
+        retry_after: Header value, either delta-seconds or an HTTP-date
+
+    Returns:
+        Seconds to wait, falling back to DEFAULT_RETRY_AFTER_SECONDS when
+        the header is missing or malformed
+    """
+    if not retry_after:
+        return DEFAULT_RETRY_AFTER_SECONDS
+
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER_SECONDS
 
 
 class SECDownloader:
     """Download SEC bulk data files with rate limiting and error handling."""
 
-    def __init__(self, config: SECConfig) -> None:
+    def __init__(self, config: SECConfig, stream: bool = True) -> None:
         """Initialize SEC downloader.
 
         Args:
             config: SEC configuration object
+            stream: Pipe downloads directly into GCS; when False, each file is
+                read into memory before it is uploaded
         """
         self.config = config
+        self.stream = stream
         self.rate_limiter = RateLimiter(requests_per_second=config.RATE_LIMIT_REQUESTS)
-        self.storage_client = storage.Client(project=config.GCP_PROJECT_ID)
+        self.storage_client = _get_storage_client(config.GCP_PROJECT_ID)
         self.bucket = self.storage_client.bucket(config.RAW_BUCKET)
 
         self.session = requests.Session()
@@ -47,27 +230,44 @@ class SECDownloader:
             "Host": "www.sec.gov",
         })
 
+        # Retry connect and read failures inside urllib3, before a response
+        # ever reaches the tenacity retries. Status codes are left to
+        # tenacity alone so one outage is not retried by both layers. All
+        # traffic goes to one host, so a small blocking pool is enough and
+        # reuses the same kept-alive connections.
+        adapter = KeepAliveAdapter(
+            pool_connections=4,
+            pool_maxsize=4,
+            pool_block=True,
+            max_retries=Retry(
+                total=3,
+                connect=3,
+                read=3,
+                backoff_factor=1,
+                status_forcelist=(),
+                allowed_methods=["GET", "HEAD"],
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
         logger.info(
             f"Initialized SECDownloader with bucket: {config.RAW_BUCKET}, "
             f"rate limit: {config.RATE_LIMIT_REQUESTS} req/s"
         )
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        retry=retry_if_exception_type((requests.RequestException, SECDownloadError)),
-    )
-    def _download_file(self, url: str) -> bytes:
-        """Download file from URL with retry logic.
+    def _open_response(self, url: str) -> requests.Response:
+        """Issue a rate-limited streaming GET request.
 
         Args:
             url: URL to download from
 
         Returns:
-            File contents as bytes
+            Response with the body not yet read
 
         Raises:
-            SECDownloadError: If download fails after retries
+            SECDownloadError: If the request fails
         """
         self.rate_limiter.acquire()
 
@@ -80,29 +280,139 @@ class SECDownloader:
                 stream=True,
             )
             response.raise_for_status()
-
-            # Read content
-            content = response.content
-            logger.info(f"Downloaded {len(content)} bytes from {url}")
-
-            return content
+            return response
 
         except requests.HTTPError as e:
             if e.response.status_code == 429:
-                logger.warning("Rate limit hit (429), backing off...")
-                time.sleep(10)
-                raise SECDownloadError(f"Rate limit exceeded: {e}")
+                # The retry policy waits as long as the server asks
+                delay = retry_after_seconds(e.response.headers.get("Retry-After"))
+                logger.warning(f"Rate limit hit (429), retrying after {delay:.1f}s")
+                raise SECDownloadError(f"Rate limit exceeded: {e}", retry_after=delay)
             elif e.response.status_code >= 500:
                 logger.warning(f"Server error {e.response.status_code}, will retry")
                 raise SECDownloadError(f"Server error: {e}")
             else:
                 logger.error(f"HTTP error {e.response.status_code}: {e}")
-                raise SECDownloadError(f"HTTP error: {e}")
+                raise SECDownloadError(f"HTTP error: {e}", retryable=False)
 
         except requests.RequestException as e:
             logger.error(f"Request failed: {e}")
             raise SECDownloadError(f"Request failed: {e}")
 
+    def _source_etag(self, url: str) -> Optional[str]:
+        """Fetch the current ETag of a file on the SEC server.
+
+        Args:
+            url: URL of the file
+
+        Returns:
+            ETag header value, or None if the HEAD request failed or the
+            server sent none
+        """
+        self.rate_limiter.acquire()
+
+        try:
+            response = self.session.head(
+                url,
+                timeout=self.config.TIMEOUT_SECONDS,
+                allow_redirects=True,
+            )
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.warning(f"HEAD request for {url} failed, will download: {e}")
+            return None
+
+        return response.headers.get("ETag")
+
+    def _is_current(self, destination_path: str, etag: Optional[str]) -> bool:
+        """Check whether GCS already holds the file version with this ETag.
+
+        Args:
+            destination_path: GCS path (without bucket name)
+            etag: ETag of the file on the SEC server
+
+        Returns:
+            True if the stored blob was downloaded from the same version
+        """
+        if not etag:
+            return False
+
+        existing = self.bucket.get_blob(destination_path)
+        return bool(
+            existing is not None
+            and existing.metadata
+            and existing.metadata.get("source_etag") == etag
+        )
+
+    @_retry_download
+    def _download_file(self, url: str) -> bytes:
+        """Download file from URL with retry logic.
+
+        Args:
+            url: URL to download from
+
+        Returns:
+            File contents as bytes
+
+        Raises:
+            SECDownloadError: If download fails after retries
+        """
+        response = self._open_response(url)
+
+        # Read the body in chunks, hashing as it arrives so the digest costs
+        # no extra pass over the content
+        digest = hashlib.sha256()
+        chunks = []
+        with response:
+            for chunk in response.iter_content(chunk_size=READ_CHUNK_SIZE):
+                digest.update(chunk)
+                chunks.append(chunk)
+
+        content = b"".join(chunks)
+        logger.info(
+            f"Downloaded {len(content)} bytes from {url} "
+            f"(sha256 {digest.hexdigest()})"
+        )
+
+        return content
+
+    @_retry_download
+    def _stream_to_gcs(
+        self,
+        url: str,
+        destination_path: str,
+        metadata: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Pipe a download straight into a GCS resumable upload.
+
+        The response body is never held in memory or written to disk; chunks
+        are read from the socket and uploaded as they arrive.
+
+        Args:
+            url: URL to download from
+            destination_path: GCS destination path (without bucket name)
+            metadata: Optional metadata to attach to the blob
+
+        Raises:
+            SECDownloadError: If download fails after retries
+        """
+        response = self._open_response(url)
+
+        content_length = response.headers.get("Content-Length")
+        chunk_size = upload_chunk_size(int(content_length) if content_length else None)
+
+        blob = self.bucket.blob(destination_path, chunk_size=chunk_size)
+
+        if metadata:
+            blob.metadata = metadata
+
+        with response:
+            # Undo any Content-Encoding so the stored object is the zip itself
+            response.raw.decode_content = True
+            blob.upload_from_file(response.raw, rewind=False)
+
+        logger.info(f"Streamed {url} to gs://{self.config.RAW_BUCKET}/{destination_path}")
+
     def _upload_to_gcs(
         self,
         content: bytes,
@@ -124,11 +434,59 @@ class SECDownloader:
         blob.upload_from_string(content)
         logger.info(f"Uploaded {len(content)} bytes to gs://{self.config.RAW_BUCKET}/{destination_path}")
 
-    def download_companyfacts(self, year: Optional[int] = None) -> str:
+    def _download_bulk(
+        self,
+        url: str,
+        gcs_path: str,
+        run_ts: Optional[str],
+        file_type: str,
+    ) -> str:
+        """Copy a bulk file to GCS unless the stored copy is already current.
+
+        Args:
+            url: URL of the bulk file
+            gcs_path: GCS destination path (without bucket name)
+            run_ts: Download timestamp (epoch seconds) to record, or None
+                for the current time
+            file_type: Bulk file type recorded in the blob metadata
+
+        Returns:
+            GCS path of the file
+        """
+        # SEC republishes bulk files far less often than this runs; skip
+        # the transfer when the stored copy matches the server's version
+        etag = self._source_etag(url)
+        if self._is_current(gcs_path, etag):
+            logger.info(f"{gcs_path} unchanged since last download, skipping")
+            return f"gs://{self.config.RAW_BUCKET}/{gcs_path}"
+
+        metadata = {
+            "source": "sec-edgar",
+            "file_type": file_type,
+            "download_timestamp": run_ts or current_run_ts(),
+        }
+        if etag:
+            metadata["source_etag"] = etag
+
+        if self.stream:
+            self._stream_to_gcs(url, gcs_path, metadata)
+        else:
+            content = self._download_file(url)
+            self._upload_to_gcs(content, gcs_path, metadata)
+
+        return f"gs://{self.config.RAW_BUCKET}/{gcs_path}"
+
+    def download_companyfacts(
+        self,
+        year: Optional[int] = None,
+        run_ts: Optional[str] = None,
+    ) -> str:
         """Download companyfacts.zip bulk file.
 
         Args:
             year: Optional year for partitioning (uses current year if None)
+            run_ts: Download timestamp (epoch seconds) to record; pass the
+                same value for files fetched as one snapshot
 
         Returns:
             GCS path where file was uploaded
@@ -138,27 +496,22 @@ class SECDownloader:
 
         logger.info(f"Starting download of {filename}")
 
-        # Download file
-        content = self._download_file(url)
-
         # Generate GCS path
         gcs_path = StorageConfig.get_bulk_path(filename, year)
 
-        # Upload to GCS
-        metadata = {
-            "source": "sec-edgar",
-            "file_type": "companyfacts",
-            "download_timestamp": str(int(time.time())),
-        }
-        self._upload_to_gcs(content, gcs_path, metadata)
-
-        return f"gs://{self.config.RAW_BUCKET}/{gcs_path}"
+        return self._download_bulk(url, gcs_path, run_ts, file_type="companyfacts")
 
-    def download_submissions(self, year: Optional[int] = None) -> str:
+    def download_submissions(
+        self,
+        year: Optional[int] = None,
+        run_ts: Optional[str] = None,
+    ) -> str:
         """Download submissions.zip bulk file.
 
         Args:
             year: Optional year for partitioning (uses current year if None)
+            run_ts: Download timestamp (epoch seconds) to record; pass the
+                same value for files fetched as one snapshot
 
         Returns:
             GCS path where file was uploaded
@@ -168,21 +521,10 @@ class SECDownloader:
 
         logger.info(f"Starting download of {filename}")
 
-        # Download file
-        content = self._download_file(url)
-
         # Generate GCS path
         gcs_path = StorageConfig.get_bulk_path(filename, year)
 
-        # Upload to GCS
-        metadata = {
-            "source": "sec-edgar",
-            "file_type": "submissions",
-            "download_timestamp": str(int(time.time())),
-        }
-        self._upload_to_gcs(content, gcs_path, metadata)
-
-        return f"gs://{self.config.RAW_BUCKET}/{gcs_path}"
+        return self._download_bulk(url, gcs_path, run_ts, file_type="submissions")
 
     def download_all_bulk_files(self, year: Optional[int] = None) -> Dict[str, str]:
         """Download all bulk files.
@@ -195,11 +537,27 @@ class SECDownloader:
         """
         results = {}
 
+        downloads = {
+            "companyfacts": self.download_companyfacts,
+            "submissions": self.download_submissions,
+        }
+
+        # Stamp both files with one timestamp so they read as a single snapshot
+        run_ts = current_run_ts()
+
         try:
             logger.info("Starting bulk file downloads")
 
-            results["companyfacts"] = self.download_companyfacts(year)
-            results["submissions"] = self.download_submissions(year)
+            # The transfers are independent and I/O bound; the shared rate
+            # limiter keeps their SEC requests within the limit
+            with ThreadPoolExecutor(max_workers=len(downloads)) as executor:
+                futures = {
+                    executor.submit(download, year, run_ts): file_type
+                    for file_type, download in downloads.items()
+                }
+
+                for future in as_completed(futures):
+                    results[futures[future]] = future.result()
 
             logger.info(f"Successfully downloaded {len(results)} bulk files")
 
@@ -210,6 +568,9 @@ class SECDownloader:
         return results
 
     def close(self) -> None:
-        """Close the downloader and clean up resources."""
+        """Close the downloader and clean up resources.
+
+        The storage client is shared with other downloaders and stays open.
+        """
         self.session.close()
         logger.info("SECDownloader closed")
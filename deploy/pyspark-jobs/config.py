@@ -1,26 +1,26 @@
 """Configuration for PySpark XBRL processing jobs."""
 
 import os
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import Tuple
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SparkConfig:
     """Configuration for Spark jobs."""
 
     # GCP Configuration
-    GCP_PROJECT_ID: str = os.getenv("GCP_PROJECT_ID", "")
-    GCP_REGION: str = os.getenv("GCP_REGION", "us-central1")
+    GCP_PROJECT_ID: str = field(default_factory=lambda: os.getenv("GCP_PROJECT_ID", ""))
+    GCP_REGION: str = field(default_factory=lambda: os.getenv("GCP_REGION", "us-central1"))
 
     # GCS Buckets
-    RAW_BUCKET: str = os.getenv("GCS_RAW_BUCKET", "")
-    PROCESSED_BUCKET: str = os.getenv("GCS_PROCESSED_BUCKET", "")
+    RAW_BUCKET: str = field(default_factory=lambda: os.getenv("GCS_RAW_BUCKET", ""))
+    PROCESSED_BUCKET: str = field(default_factory=lambda: os.getenv("GCS_PROCESSED_BUCKET", ""))
 
     # BigQuery Datasets
-    BRONZE_DATASET: str = os.getenv("BQ_BRONZE_DATASET", "bronze_sec")
-    SILVER_DATASET: str = os.getenv("BQ_SILVER_DATASET", "silver_sec")
-    GOLD_DATASET: str = os.getenv("BQ_GOLD_DATASET", "gold_sec")
+    BRONZE_DATASET: str = field(default_factory=lambda: os.getenv("BQ_BRONZE_DATASET", "bronze_sec"))
+    SILVER_DATASET: str = field(default_factory=lambda: os.getenv("BQ_SILVER_DATASET", "silver_sec"))
+    GOLD_DATASET: str = field(default_factory=lambda: os.getenv("BQ_GOLD_DATASET", "gold_sec"))
 
     # Spark Configuration
     APP_NAME: str = "SEC-XBRL-Processing"
@@ -30,13 +30,16 @@ class SparkConfig:
 
     # Processing Configuration
     PARTITION_COLUMN: str = "fiscal_year"
-    CLUSTER_COLUMNS: List[str] = None
+    CLUSTER_COLUMNS: Tuple[str, ...] = ("cik", "concept")
 
-    def __post_init__(self) -> None:
-        """Initialize default values and validate configuration."""
-        if self.CLUSTER_COLUMNS is None:
-            self.CLUSTER_COLUMNS = ["cik", "concept"]
+    # Data Quality Thresholds
+    MIN_FINANCIAL_FACTS: int = 1000
+    MIN_QUALITY_PASS_RATE: float = 95.0  # Percentage
+    MIN_FISCAL_YEAR: int = 2000
+    MAX_FISCAL_YEAR: int = 2030
 
+    def __post_init__(self) -> None:
+        """Validate configuration."""
         if not self.GCP_PROJECT_ID:
             raise ValueError("GCP_PROJECT_ID environment variable is required")
         if not self.RAW_BUCKET:
@@ -45,83 +48,89 @@ class SparkConfig:
             raise ValueError("GCS_PROCESSED_BUCKET environment variable is required")
 
 
-@dataclass
+# US-GAAP Taxonomy concepts to extract. Kept as module-level tuples so
+# building an XBRLConfig does not allocate fresh lists each time.
+_INCOME_STATEMENT_CONCEPTS: Tuple[str, ...] = (
+    "Revenues",
+    "RevenueFromContractWithCustomerExcludingAssessedTax",
+    "CostOfRevenue",
+    "GrossProfit",
+    "OperatingIncomeLoss",
+    "NetIncomeLoss",
+    "EarningsPerShareBasic",
+    "EarningsPerShareDiluted",
+    "OperatingExpenses",
+    "ResearchAndDevelopmentExpense",
+    "SellingGeneralAndAdministrativeExpense",
+    "InterestExpense",
+    "IncomeTaxExpenseBenefit",
+)
+
+_BALANCE_SHEET_CONCEPTS: Tuple[str, ...] = (
+    "Assets",
+    "AssetsCurrent",
+    "AssetsNoncurrent",
+    "CashAndCashEquivalentsAtCarryingValue",
+    "AccountsReceivableNetCurrent",
+    "InventoryNet",
+    "Liabilities",
+    "LiabilitiesCurrent",
+    "LiabilitiesNoncurrent",
+    "AccountsPayableCurrent",
+    "LongTermDebtNoncurrent",
+    "StockholdersEquity",
+    "RetainedEarningsAccumulatedDeficit",
+    "CommonStockValue",
+)
+
+_CASH_FLOW_CONCEPTS: Tuple[str, ...] = (
+    "NetCashProvidedByUsedInOperatingActivities",
+    "NetCashProvidedByUsedInInvestingActivities",
+    "NetCashProvidedByUsedInFinancingActivities",
+    "PaymentsToAcquirePropertyPlantAndEquipment",
+    "PaymentsOfDividends",
+    "ProceedsFromIssuanceOfLongTermDebt",
+    "RepaymentsOfLongTermDebt",
+)
+
+_ALL_CONCEPTS: Tuple[str, ...] = (
+    _INCOME_STATEMENT_CONCEPTS + _BALANCE_SHEET_CONCEPTS + _CASH_FLOW_CONCEPTS
+)
+
+_VALID_UNITS: Tuple[str, ...] = ("USD", "shares", "pure")
+_VALID_FORMS: Tuple[str, ...] = ("10-K", "10-Q", "8-K", "20-F", "40-F")
+
+
+@dataclass(frozen=True, slots=True)
 class XBRLConfig:
     """Configuration for XBRL parsing."""
 
     # US-GAAP Taxonomy concepts to extract
-    INCOME_STATEMENT_CONCEPTS: List[str] = None
-    BALANCE_SHEET_CONCEPTS: List[str] = None
-    CASH_FLOW_CONCEPTS: List[str] = None
+    INCOME_STATEMENT_CONCEPTS: Tuple[str, ...] = _INCOME_STATEMENT_CONCEPTS
+    BALANCE_SHEET_CONCEPTS: Tuple[str, ...] = _BALANCE_SHEET_CONCEPTS
+    CASH_FLOW_CONCEPTS: Tuple[str, ...] = _CASH_FLOW_CONCEPTS
 
     # Valid units to process
-    VALID_UNITS: List[str] = None
+    VALID_UNITS: Tuple[str, ...] = _VALID_UNITS
 
     # Valid forms
-    VALID_FORMS: List[str] = None
+    VALID_FORMS: Tuple[str, ...] = _VALID_FORMS
 
-    def __post_init__(self) -> None:
-        """Initialize default concept lists."""
-        if self.INCOME_STATEMENT_CONCEPTS is None:
-            self.INCOME_STATEMENT_CONCEPTS = [
-                "Revenues",
-                "RevenueFromContractWithCustomerExcludingAssessedTax",
-                "CostOfRevenue",
-                "GrossProfit",
-                "OperatingIncomeLoss",
-                "NetIncomeLoss",
-                "EarningsPerShareBasic",
-                "EarningsPerShareDiluted",
-                "OperatingExpenses",
-                "ResearchAndDevelopmentExpense",
-                "SellingGeneralAndAdministrativeExpense",
-                "InterestExpense",
-                "IncomeTaxExpenseBenefit",
-            ]
-
-        if self.BALANCE_SHEET_CONCEPTS is None:
-            self.BALANCE_SHEET_CONCEPTS = [
-                "Assets",
-                "AssetsCurrent",
-                "AssetsNoncurrent",
-                "CashAndCashEquivalentsAtCarryingValue",
-                "AccountsReceivableNetCurrent",
-                "InventoryNet",
-                "Liabilities",
-                "LiabilitiesCurrent",
-                "LiabilitiesNoncurrent",
-                "AccountsPayableCurrent",
-                "LongTermDebtNoncurrent",
-                "StockholdersEquity",
-                "RetainedEarningsAccumulatedDeficit",
-                "CommonStockValue",
-            ]
-
-        if self.CASH_FLOW_CONCEPTS is None:
-            self.CASH_FLOW_CONCEPTS = [
-                "NetCashProvidedByUsedInOperatingActivities",
-                "NetCashProvidedByUsedInInvestingActivities",
-                "NetCashProvidedByUsedInFinancingActivities",
-                "PaymentsToAcquirePropertyPlantAndEquipment",
-                "PaymentsOfDividends",
-                "ProceedsFromIssuanceOfLongTermDebt",
-                "RepaymentsOfLongTermDebt",
-            ]
-
-        if self.VALID_UNITS is None:
-            self.VALID_UNITS = ["USD", "shares", "pure"]
-
-        if self.VALID_FORMS is None:
-            self.VALID_FORMS = ["10-K", "10-Q", "8-K", "20-F", "40-F"]
-
-    def get_all_concepts(self) -> List[str]:
+    def get_all_concepts(self) -> Tuple[str, ...]:
         """Get all configured concepts.
 
         Returns:
-            List of all concept names
+            Tuple of all concept names
         """
+        if (
+            self.INCOME_STATEMENT_CONCEPTS is _INCOME_STATEMENT_CONCEPTS
+            and self.BALANCE_SHEET_CONCEPTS is _BALANCE_SHEET_CONCEPTS
+            and self.CASH_FLOW_CONCEPTS is _CASH_FLOW_CONCEPTS
+        ):
+            return _ALL_CONCEPTS
+
         return (
-            self.INCOME_STATEMENT_CONCEPTS
-            + self.BALANCE_SHEET_CONCEPTS
-            + self.CASH_FLOW_CONCEPTS
+            tuple(self.INCOME_STATEMENT_CONCEPTS)
+            + tuple(self.BALANCE_SHEET_CONCEPTS)
+            + tuple(self.CASH_FLOW_CONCEPTS)
         )
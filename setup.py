@@ -33,12 +33,14 @@ setup(
         "pyspark>=3.5.0",
         "pandas>=2.1.4",
         "requests>=2.31.0",
+        "orjson>=3.9.10",
         "python-dotenv>=1.0.0",
     ],
     extras_require={
         "dev": [
             "pytest>=7.4.3",
             "pytest-cov>=4.1.0",
+            "pytest-xdist>=3.5.0",
             "black>=23.12.1",
             "flake8>=6.1.0",
             "mypy>=1.7.1",
@@ -1,11 +1,11 @@
 """Configuration for SEC data ingestion."""
 
 import os
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import ClassVar, Optional
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SECConfig:
     """Configuration for SEC API access."""
 
@@ -16,15 +16,15 @@ class SECConfig:
 
     # API Configuration
     RATE_LIMIT_REQUESTS: int = 10  # requests per second
-    USER_AGENT: str = os.getenv("SEC_USER_AGENT", "")
+    USER_AGENT: str = field(default_factory=lambda: os.getenv("SEC_USER_AGENT", ""))
 
     # GCP Configuration
-    GCP_PROJECT_ID: str = os.getenv("GCP_PROJECT_ID", "")
-    RAW_BUCKET: str = os.getenv("GCS_RAW_BUCKET", "")
+    GCP_PROJECT_ID: str = field(default_factory=lambda: os.getenv("GCP_PROJECT_ID", ""))
+    RAW_BUCKET: str = field(default_factory=lambda: os.getenv("GCS_RAW_BUCKET", ""))
 
     # Data Configuration
-    START_YEAR: int = int(os.getenv("DATA_START_YEAR", "2020"))
-    END_YEAR: int = int(os.getenv("DATA_END_YEAR", "2024"))
+    START_YEAR: int = field(default_factory=lambda: int(os.getenv("DATA_START_YEAR", "2020")))
+    END_YEAR: int = field(default_factory=lambda: int(os.getenv("DATA_END_YEAR", "2024")))
 
     # Retry Configuration
     MAX_RETRIES: int = 3
@@ -32,7 +32,7 @@ class SECConfig:
     TIMEOUT_SECONDS: int = 300
 
     # Logging
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVEL: str = field(default_factory=lambda: os.getenv("LOG_LEVEL", "INFO"))
 
     def __post_init__(self) -> None:
         """Validate configuration after initialization."""
@@ -48,13 +48,13 @@ class SECConfig:
             raise ValueError("START_YEAR must be less than or equal to END_YEAR")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StorageConfig:
     """Configuration for GCS storage paths."""
 
-    BULK_PREFIX: str = "bulk"
-    DAILY_INDEX_PREFIX: str = "daily-index"
-    FILINGS_PREFIX: str = "filings"
+    BULK_PREFIX: ClassVar[str] = "bulk"
+    DAILY_INDEX_PREFIX: ClassVar[str] = "daily-index"
+    FILINGS_PREFIX: ClassVar[str] = "filings"
 
     @staticmethod
     def get_bulk_path(filename: str, year: Optional[int] = None) -> str:
@@ -2,21 +2,50 @@
 
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache
 from typing import Any, Dict
 
+import orjson
 from google.cloud import logging as cloud_logging
 
 from .config import SECConfig
-from .sec_downloader import SECDownloader
+from .sec_downloader import SECDownloader, current_run_ts
 
 
-# Set up Cloud Logging
-cloud_logging_client = cloud_logging.Client()
-cloud_logging_client.setup_logging()
-
 logger = logging.getLogger(__name__)
 
+_LOGGING_READY = False
+_LOGGING_LOCK = threading.Lock()
+
+
+def _setup_logging_once() -> None:
+    """Attach Cloud Logging on the first invocation.
+
+    Creating the client fetches credentials from the metadata server, so it is
+    kept off the import path to keep cold starts fast. Concurrent requests
+    share the instance, so the setup runs under a lock.
+    """
+    global _LOGGING_READY
+    if _LOGGING_READY:
+        return
+
+    with _LOGGING_LOCK:
+        if _LOGGING_READY:
+            return
+
+        cloud_logging_client = cloud_logging.Client()
+        cloud_logging_client.setup_logging()
+        _LOGGING_READY = True
+
+
+@lru_cache(maxsize=1)
+def _get_config() -> SECConfig:
+    """Return the configuration shared by warm invocations."""
+    return SECConfig()
+
 
 def ingest_sec_data(request: Any) -> tuple[str, int]:
     """Cloud Function entry point for SEC data ingestion.
@@ -33,38 +62,54 @@ def ingest_sec_data(request: Any) -> tuple[str, int]:
         Tuple of (response message, HTTP status code)
     """
     try:
-        # Parse request
-        request_json = {}
-        if hasattr(request, 'get_json'):
-            request_json = request.get_json(silent=True) or {}
-        elif hasattr(request, 'data'):
+        _setup_logging_once()
+
+        # Parse request. Flask caches the result of get_json, so the raw body
+        # is only decoded here when get_json is unavailable or found nothing.
+        get_json = getattr(request, 'get_json', None)
+        request_json = get_json(silent=True) if get_json else None
+        if request_json is None:
             try:
-                request_json = json.loads(request.data)
-            except (json.JSONDecodeError, AttributeError):
-                pass
+                request_json = json.loads(getattr(request, 'data', None) or b'{}')
+            except (ValueError, TypeError) as e:
+                # ValueError covers malformed JSON and bodies that are not UTF-8
+                error_msg = f"Invalid request body: {str(e)}"
+                logger.error(error_msg)
+                return orjson.dumps({"status": "error", "message": error_msg}).decode(), 400
 
-        logger.info(f"Received request: {request_json}")
+        logger.info("Received request: %s", request_json)
 
         # Get parameters
         year = request_json.get('year', datetime.now().year)
         file_types = request_json.get('file_types', ['companyfacts', 'submissions'])
 
         # Initialize configuration
-        config = SECConfig()
+        config = _get_config()
         logger.info(f"Initialized config for project: {config.GCP_PROJECT_ID}")
 
-        # Initialize downloader
-        downloader = SECDownloader(config)
+        # Initialize downloader, streaming files straight to GCS
+        downloader = SECDownloader(config, stream=True)
 
-        # Download files
-        results = {}
+        # Select downloads
+        downloads = {}
         if 'companyfacts' in file_types or 'all' in file_types:
-            logger.info("Downloading companyfacts...")
-            results['companyfacts'] = downloader.download_companyfacts(year)
+            downloads['companyfacts'] = downloader.download_companyfacts
 
         if 'submissions' in file_types or 'all' in file_types:
-            logger.info("Downloading submissions...")
-            results['submissions'] = downloader.download_submissions(year)
+            downloads['submissions'] = downloader.download_submissions
+
+        # Download files concurrently; both are I/O bound and share the
+        # downloader's rate limiter, and are stamped with one timestamp
+        run_ts = current_run_ts()
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, len(downloads))) as executor:
+            futures = {}
+            for file_type, download in downloads.items():
+                logger.info(f"Downloading {file_type}...")
+                futures[executor.submit(download, year, run_ts)] = file_type
+
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
 
         # Close downloader
         downloader.close()
@@ -78,19 +123,19 @@ def ingest_sec_data(request: Any) -> tuple[str, int]:
             "results": results,
         }
 
-        logger.info(f"Ingestion completed successfully: {response}")
+        logger.info("Ingestion completed successfully: %s", response)
 
-        return json.dumps(response), 200
+        return orjson.dumps(response).decode(), 200
 
     except ValueError as e:
         error_msg = f"Configuration error: {str(e)}"
         logger.error(error_msg)
-        return json.dumps({"status": "error", "message": error_msg}), 400
+        return orjson.dumps({"status": "error", "message": error_msg}).decode(), 400
 
     except Exception as e:
         error_msg = f"Unexpected error during ingestion: {str(e)}"
         logger.exception(error_msg)
-        return json.dumps({"status": "error", "message": error_msg}), 500
+        return orjson.dumps({"status": "error", "message": error_msg}).decode(), 500
 
 
 def main() -> None:
@@ -1,62 +1,83 @@
 """Rate limiter for SEC API requests."""
 
+import threading
 import time
-from collections import deque
-from typing import Deque
 
 
 class RateLimiter:
     """Token bucket rate limiter for SEC API compliance.
 
-    SEC requires no more than 10 requests per second.
+    SEC requires no more than 10 requests per second. By default the bucket
+    holds a single token that refills at the configured rate, so requests are
+    spaced evenly and no one-second window can exceed the limit.
     """
 
-    def __init__(self, requests_per_second: int = 10) -> None:
+    def __init__(self, requests_per_second: int = 10, burst: int = 1) -> None:
         """Initialize rate limiter.
 
         Args:
             requests_per_second: Maximum number of requests allowed per second
+            burst: Number of requests that may be issued back to back after
+                an idle period. Any value above 1 lets a one-second window
+                exceed requests_per_second, so keep the default for SEC.
         """
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
         self.requests_per_second = requests_per_second
         self.time_window = 1.0  # 1 second window
-        self.request_times: Deque[float] = deque()
+        self.capacity = float(burst)
+        self.refill_rate = requests_per_second / self.time_window  # tokens per second
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic_ns()
+        self._cond = threading.Condition()
+
+    def _refill(self, now: int) -> None:
+        """Add the tokens accrued since the last refill.
+
+        Args:
+            now: Current monotonic time in nanoseconds
+        """
+        elapsed = (now - self.last_refill) / 1e9
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+        self.last_refill = now
 
     def acquire(self) -> None:
         """Acquire permission to make a request.
 
         Blocks until a request slot is available within the rate limit.
+        Waiting callers release the condition's lock, and are woken early
+        if the limiter is reset.
         """
-        current_time = time.time()
+        with self._cond:
+            while True:
+                self._refill(time.monotonic_ns())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
 
-        # Remove requests outside the time window
-        while self.request_times and current_time - self.request_times[0] >= self.time_window:
-            self.request_times.popleft()
-
-        # If we're at the limit, wait
-        if len(self.request_times) >= self.requests_per_second:
-            sleep_time = self.time_window - (current_time - self.request_times[0])
-            if sleep_time > 0:
-                time.sleep(sleep_time)
-            # Remove the oldest request after sleeping
-            self.request_times.popleft()
-
-        # Record this request
-        self.request_times.append(time.time())
+                self._cond.wait(timeout=(1 - self.tokens) / self.refill_rate)
 
     def reset(self) -> None:
-        """Reset the rate limiter state."""
-        self.request_times.clear()
+        """Reset the rate limiter state, releasing any waiting callers."""
+        with self._cond:
+            self.tokens = self.capacity
+            self.last_refill = time.monotonic_ns()
+            self._cond.notify_all()
 
     def get_current_rate(self) -> float:
         """Get current request rate (requests per second).
 
+        Estimated from how far the bucket is drained: an empty bucket means
+        requests are arriving at the full configured rate.
+
         Returns:
             Current request rate
         """
-        current_time = time.time()
-
-        # Remove requests outside the time window
-        while self.request_times and current_time - self.request_times[0] >= self.time_window:
-            self.request_times.popleft()
+        with self._cond:
+            self._refill(time.monotonic_ns())
+            drained = self.capacity - self.tokens
 
-        return len(self.request_times) / self.time_window if self.request_times else 0.0
+        return drained / self.capacity * self.refill_rate
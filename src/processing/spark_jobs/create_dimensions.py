@@ -1,6 +1,10 @@
 """PySpark job to create dimension tables in BigQuery."""
 
 import logging
+from datetime import date
+from typing import Optional
+
+from pyspark import StorageLevel
 from pyspark.sql import SparkSession, DataFrame
 from pyspark.sql import functions as F
 from pyspark.sql.types import StringType, IntegerType
@@ -10,10 +14,23 @@ from .config import SparkConfig
 
 logger = logging.getLogger(__name__)
 
+# First day of electronic filings on EDGAR
+EDGAR_START_DATE = date(1993, 1, 1)
+
 
 class DimensionBuilder:
     """Build dimension tables from raw SEC data."""
 
+    # raw_financials columns read by the dimension builders
+    RAW_FINANCIALS_COLUMNS = [
+        "cik",
+        "cik_padded",
+        "concept",
+        "statement_type",
+        "fiscal_year",
+        "accession_number",
+    ]
+
     def __init__(self, spark: SparkSession, config: SparkConfig):
         """Initialize dimension builder.
 
@@ -37,9 +54,16 @@ class DimensionBuilder:
         table_id = f"{self.config.GCP_PROJECT_ID}.{dataset}.{table_name}"
         logger.info(f"Reading from BigQuery table: {table_id}")
 
-        df = self.spark.read.format("bigquery").option("table", table_id).load()
+        # Ask for enough Storage API read streams to keep every core busy;
+        # left alone, the connector often opens very few for mid-sized tables
+        parallelism = self.spark.sparkContext.defaultParallelism
+
+        df = self.spark.read.format("bigquery") \
+            .option("table", table_id) \
+            .option("preferredMinParallelism", str(parallelism)) \
+            .option("maxParallelism", str(parallelism * 4)) \
+            .load()
 
-        logger.info(f"Read {df.count()} records from {table_id}")
         return df
 
     def write_to_bigquery(
@@ -61,13 +85,16 @@ class DimensionBuilder:
 
         logger.info(f"Writing to BigQuery table: {table_id}")
 
-        df.write.format("bigquery") \
+        # Dimension tables are small, and each task opens its own Storage
+        # Write API stream; a single task sends the rows in a few large
+        # appends instead of many near-empty streams.
+        df.coalesce(1).write.format("bigquery") \
             .option("table", table_id) \
             .option("writeMethod", "direct") \
             .mode(mode) \
             .save()
 
-        logger.info(f"Successfully wrote {df.count()} records to {table_id}")
+        logger.info(f"Successfully wrote to {table_id}")
 
     def create_dim_companies(self, raw_companies_df: DataFrame, raw_financials_df: DataFrame) -> DataFrame:
         """Create companies dimension table.
@@ -108,21 +135,26 @@ class DimensionBuilder:
             "updated_at", F.current_timestamp()
         )
 
-        # Get filing statistics from financials
-        filing_stats = raw_financials_df.groupBy("cik_padded").agg(
+        # Get filing statistics from financials. The filing count is an
+        # HyperLogLog estimate (about 2% error), which keeps per-group state
+        # constant instead of holding every accession number. Stats are keyed
+        # by the padded CIK under the dimension's column name, so the join
+        # below is a plain equi-join on "cik".
+        filing_stats = raw_financials_df.groupBy(
+            F.col("cik_padded").alias("cik")
+        ).agg(
             F.min("fiscal_year").alias("first_filing_year"),
             F.max("fiscal_year").alias("last_filing_year"),
-            F.countDistinct("accession_number").alias("total_filings"),
+            F.approx_count_distinct("accession_number", rsd=0.02).alias("total_filings"),
         )
 
-        # Join with stats
+        # Join with stats. There is one stats row per company, few enough to
+        # broadcast, which spares shuffling the company list; the optimizer
+        # cannot tell that from the size estimate after the aggregation.
         dim_companies = dim_companies.join(
-            filing_stats,
-            dim_companies.cik == filing_stats.cik_padded,
-            "left"
-        ).drop(filing_stats.cik_padded)
+            F.broadcast(filing_stats), "cik", "left"
+        )
 
-        logger.info(f"Created dim_companies with {dim_companies.count()} records")
         return dim_companies
 
     def create_dim_taxonomy(self, raw_financials_df: DataFrame) -> DataFrame:
@@ -136,34 +168,35 @@ class DimensionBuilder:
         """
         logger.info("Creating dim_taxonomy")
 
-        # Extract unique concepts with their metadata
-        dim_taxonomy = raw_financials_df.select(
-            F.col("concept"),
-            F.col("statement_type"),
-        ).distinct()
-
-        # Add concept metadata
-        # In production, this would be enriched from XBRL taxonomy files
-        dim_taxonomy = dim_taxonomy.withColumn(
-            "concept_label",
-            F.regexp_replace(F.col("concept"), "([A-Z])", " $1")
-        ).withColumn(
-            "data_type", F.lit("monetary").cast(StringType())
-        ).withColumn(
-            "period_type", F.lit("duration").cast(StringType())
-        ).withColumn(
-            "balance_type", F.lit(None).cast(StringType())
-        )
-
-        # Add usage statistics
+        # Extract unique concepts and their usage statistics in a single
+        # aggregation. Each concept maps to exactly one statement type, so
+        # taking the first one per group matches a distinct on both columns.
+        # companies_using is estimated like total_filings in dim_companies.
         usage_stats = raw_financials_df.groupBy("concept").agg(
-            F.countDistinct("cik").alias("companies_using"),
+            F.first("statement_type").alias("statement_type"),
+            F.approx_count_distinct("cik", rsd=0.02).alias("companies_using"),
             F.count("*").alias("total_usage_count"),
             F.min("fiscal_year").alias("first_used_year"),
             F.max("fiscal_year").alias("last_used_year"),
         )
 
-        dim_taxonomy = dim_taxonomy.join(usage_stats, "concept", "left")
+        # Add concept metadata. This runs after the aggregation, so the label
+        # regex is applied once per concept rather than once per fact.
+        # In production, this would be enriched from XBRL taxonomy files
+        dim_taxonomy = usage_stats.select(
+            F.col("concept"),
+            F.col("statement_type"),
+            F.trim(
+                F.regexp_replace(F.col("concept"), "([A-Z])", " $1")
+            ).alias("concept_label"),
+            F.lit("monetary").cast(StringType()).alias("data_type"),
+            F.lit("duration").cast(StringType()).alias("period_type"),
+            F.lit(None).cast(StringType()).alias("balance_type"),
+            F.col("companies_using"),
+            F.col("total_usage_count"),
+            F.col("first_used_year"),
+            F.col("last_used_year"),
+        )
 
         # Add metadata
         dim_taxonomy = dim_taxonomy.withColumn(
@@ -172,24 +205,35 @@ class DimensionBuilder:
             "updated_at", F.current_timestamp()
         )
 
-        logger.info(f"Created dim_taxonomy with {dim_taxonomy.count()} records")
         return dim_taxonomy
 
-    def create_dim_dates(self, raw_financials_df: DataFrame) -> DataFrame:
+    def create_dim_dates(
+        self,
+        start_date: date = EDGAR_START_DATE,
+        end_date: Optional[date] = None,
+    ) -> DataFrame:
         """Create date dimension table.
 
+        Covers every calendar day in the range, so it is generated directly
+        rather than derived from the distinct dates in the raw financials.
+
         Args:
-            raw_financials_df: Raw financials data
+            start_date: First date in the dimension
+            end_date: Last date in the dimension (today if None)
 
         Returns:
             Date dimension DataFrame
         """
         logger.info("Creating dim_dates")
 
-        # Extract unique dates
-        dates_df = raw_financials_df.select(
-            F.to_date(F.col("end_date")).alias("date")
-        ).distinct().filter(F.col("date").isNotNull())
+        if end_date is None:
+            end_date = date.today()
+        if start_date > end_date:
+            raise ValueError("start_date must be on or before end_date")
+
+        dates_df = self.spark.range(1).select(
+            F.explode(F.sequence(F.lit(start_date), F.lit(end_date))).alias("date")
+        )
 
         # Add date attributes
         dim_dates = dates_df.withColumn(
@@ -212,7 +256,6 @@ class DimensionBuilder:
             F.date_format(F.col("date"), "yyyy-MM")
         )
 
-        logger.info(f"Created dim_dates with {dim_dates.count()} records")
         return dim_dates
 
 
@@ -230,8 +273,16 @@ def main(
     spark = SparkSession.builder \
         .appName("SEC-Create-Dimensions") \
         .config("spark.jars.packages", "com.google.cloud.spark:spark-bigquery-with-dependencies_2.12:0.32.2") \
+        .config("spark.sql.adaptive.enabled", "true") \
+        .config("spark.sql.adaptive.coalescePartitions.enabled", "true") \
+        .config("spark.sql.adaptive.advisoryPartitionSizeInBytes", "128MB") \
+        .config("spark.sql.adaptive.skewJoin.enabled", "true") \
+        .config("spark.sql.adaptive.skewJoin.skewedPartitionFactor", "5") \
+        .config("spark.sql.adaptive.skewJoin.skewedPartitionThresholdInBytes", "256MB") \
         .getOrCreate()
 
+    raw_financials_df = None
+
     try:
         # Initialize configuration
         config = SparkConfig()
@@ -243,8 +294,14 @@ def main(
         raw_companies_df = builder.read_from_bigquery("raw_companies", bronze_dataset)
         raw_financials_df = builder.read_from_bigquery("raw_financials", bronze_dataset)
 
-        # Filter to quality-passed records
-        raw_financials_df = raw_financials_df.filter(F.col("data_quality_passed") == True)
+        # Filter to quality-passed records. dim_companies and dim_taxonomy are
+        # both built from them, so cache just the columns they use instead of
+        # scanning BigQuery once per dimension.
+        raw_financials_df = raw_financials_df.filter(
+            F.col("data_quality_passed") == True
+        ).select(
+            *DimensionBuilder.RAW_FINANCIALS_COLUMNS
+        ).persist(StorageLevel.MEMORY_AND_DISK)
 
         # Create dimension tables
         dim_companies = builder.create_dim_companies(raw_companies_df, raw_financials_df)
@@ -253,7 +310,7 @@ def main(
         dim_taxonomy = builder.create_dim_taxonomy(raw_financials_df)
         builder.write_to_bigquery(dim_taxonomy, "dim_taxonomy", silver_dataset)
 
-        dim_dates = builder.create_dim_dates(raw_financials_df)
+        dim_dates = builder.create_dim_dates()
         builder.write_to_bigquery(dim_dates, "dim_dates", silver_dataset)
 
         logger.info("Dimension creation job completed successfully")
@@ -263,6 +320,8 @@ def main(
         raise
 
     finally:
+        if raw_financials_df is not None:
+            raw_financials_df.unpersist()
         spark.stop()
 
 
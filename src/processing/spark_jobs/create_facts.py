@@ -3,7 +3,7 @@
 import logging
 from pyspark.sql import SparkSession, DataFrame
 from pyspark.sql import functions as F
-from pyspark.sql.window import Window
+from pyspark.storagelevel import StorageLevel
 
 from .config import SparkConfig
 
@@ -14,6 +14,23 @@ logger = logging.getLogger(__name__)
 class FactBuilder:
     """Build fact tables from raw SEC data."""
 
+    # raw_financials columns read by the fact table builders
+    RAW_FINANCIALS_COLUMNS = [
+        "cik_padded",
+        "concept",
+        "end_date",
+        "filed_date",
+        "fiscal_year",
+        "fiscal_period",
+        "form",
+        "accession_number",
+        "value",
+        "unit",
+        "statement_type",
+        "frame",
+        "data_quality_passed",
+    ]
+
     def __init__(self, spark: SparkSession, config: SparkConfig):
         """Initialize fact builder.
 
@@ -37,9 +54,16 @@ class FactBuilder:
         table_id = f"{self.config.GCP_PROJECT_ID}.{dataset}.{table_name}"
         logger.info(f"Reading from BigQuery table: {table_id}")
 
-        df = self.spark.read.format("bigquery").option("table", table_id).load()
+        # Ask for enough Storage API read streams to keep every core busy;
+        # left alone, the connector often opens very few for mid-sized tables
+        parallelism = self.spark.sparkContext.defaultParallelism
+
+        df = self.spark.read.format("bigquery") \
+            .option("table", table_id) \
+            .option("preferredMinParallelism", str(parallelism)) \
+            .option("maxParallelism", str(parallelism * 4)) \
+            .load()
 
-        logger.info(f"Read {df.count()} records from {table_id}")
         return df
 
     def write_to_bigquery(
@@ -65,6 +89,14 @@ class FactBuilder:
 
         logger.info(f"Writing to BigQuery table: {table_id}")
 
+        # Each task opens its own Storage Write API stream, so spread the rows
+        # over at least one task per core. Hashing on the clustering columns
+        # keeps each stream's rows within a narrow range of cluster keys.
+        if cluster_columns:
+            df = df.repartition(
+                self.spark.sparkContext.defaultParallelism, *cluster_columns
+            )
+
         writer = df.write.format("bigquery") \
             .option("table", table_id) \
             .option("writeMethod", "direct")
@@ -78,7 +110,7 @@ class FactBuilder:
 
         writer.mode(mode).save()
 
-        logger.info(f"Successfully wrote {df.count()} records to {table_id}")
+        logger.info(f"Successfully wrote to {table_id}")
 
     def create_fact_financials(self, raw_financials_df: DataFrame) -> DataFrame:
         """Create financial facts table.
@@ -100,11 +132,10 @@ class FactBuilder:
         fact_financials = fact_financials.select(
             F.col("cik_padded").alias("cik"),
             F.col("concept"),
-            F.to_date(F.col("end_date")).alias("end_date"),
-            F.to_date(F.col("filed_date")).alias("filing_date"),
+            F.col("end_date"),
+            F.col("filed_date").alias("filing_date"),
             F.col("fiscal_year"),
             F.col("fiscal_period"),
-            F.col("year_quarter"),
             F.col("form"),
             F.col("accession_number"),
             F.col("value"),
@@ -113,36 +144,120 @@ class FactBuilder:
             F.col("frame"),
         )
 
-        # Add surrogate key
+        # Handle duplicates - keep most recent filing. max_by in a hash
+        # aggregate avoids the full sort a row_number window needs; the filing
+        # date and an accession hash are packed into one BIGINT ordering key so
+        # ties resolve deterministically with a single long compare. Only
+        # columns that vary within a group are carried through the aggregate;
+        # year_quarter is derived from the group keys afterwards.
+        dedup_keys = ["cik", "concept", "end_date", "fiscal_year", "fiscal_period"]
+        value_columns = [c for c in fact_financials.columns if c not in dedup_keys]
+
+        ordering_key = F.coalesce(
+            F.shiftleft(F.datediff(F.col("filing_date"), F.lit("1970-01-01")).cast("long"), 32).bitwiseOR(
+                F.hash(F.col("accession_number")).cast("long").bitwiseAND(F.lit(0xFFFFFFFF))
+            ),
+            F.lit(-(1 << 63)),
+        )
+
+        fact_financials = fact_financials.groupBy(*dedup_keys).agg(
+            F.max_by(F.struct(*value_columns), ordering_key).alias("latest")
+        ).select(
+            # Same column order as before the dedup and as the silver DDL
+            "cik",
+            "concept",
+            "end_date",
+            F.col("latest.filing_date").alias("filing_date"),
+            "fiscal_year",
+            "fiscal_period",
+            F.concat(F.col("fiscal_year"), F.lit("-"), F.col("fiscal_period")).alias("year_quarter"),
+            *[F.col(f"latest.{c}").alias(c) for c in value_columns if c != "filing_date"],
+        )
+
+        # Add surrogate key once per surviving row rather than before the dedup
         fact_financials = fact_financials.withColumn(
             "fact_id",
             F.md5(
-                F.concat(
+                F.concat_ws(
+                    "|",
                     F.col("cik"),
                     F.col("concept"),
-                    F.col("end_date"),
+                    F.col("end_date").cast("string"),
                     F.col("accession_number")
                 )
             )
         )
 
-        # Handle duplicates - keep most recent filing
-        window_spec = Window.partitionBy(
-            "cik", "concept", "end_date", "fiscal_year", "fiscal_period"
-        ).orderBy(F.col("filing_date").desc())
-
-        fact_financials = fact_financials.withColumn(
-            "row_num", F.row_number().over(window_spec)
-        ).filter(F.col("row_num") == 1).drop("row_num")
-
         # Add metadata
         fact_financials = fact_financials.withColumn(
             "created_at", F.current_timestamp()
         )
 
-        logger.info(f"Created fact_financials with {fact_financials.count()} records")
         return fact_financials
 
+    def validate_fact_financials(
+        self,
+        fact_financials: DataFrame,
+        raw_financials_df: DataFrame
+    ) -> None:
+        """Validate fact_financials before it is written.
+
+        Runs the same checks as the pipeline's BigQuery data quality stage so a
+        bad batch fails here instead of after it has been written. Null critical
+        fields need no check: every fact already passed data_quality_passed.
+
+        Args:
+            fact_financials: Financial facts DataFrame
+            raw_financials_df: Raw financials data
+
+        Raises:
+            ValueError: If any data quality check fails
+        """
+        logger.info("Validating fact_financials")
+
+        fact_stats = fact_financials.agg(
+            F.count("*").alias("total_facts"),
+            F.count(
+                F.when(
+                    (F.col("fiscal_year") < self.config.MIN_FISCAL_YEAR)
+                    | (F.col("fiscal_year") > self.config.MAX_FISCAL_YEAR),
+                    True
+                )
+            ).alias("invalid_fiscal_year"),
+        ).first()
+
+        raw_stats = raw_financials_df.agg(
+            F.count("*").alias("total_records"),
+            F.count(F.when(F.col("data_quality_passed"), True)).alias("passed_records"),
+        ).first()
+
+        failed_checks = []
+
+        if fact_stats["total_facts"] < self.config.MIN_FINANCIAL_FACTS:
+            failed_checks.append(
+                f"financials_count ({fact_stats['total_facts']} < {self.config.MIN_FINANCIAL_FACTS})"
+            )
+
+        if fact_stats["invalid_fiscal_year"] > 0:
+            failed_checks.append(f"valid_fiscal_years ({fact_stats['invalid_fiscal_year']} rows)")
+
+        pass_rate = (
+            raw_stats["passed_records"] * 100.0 / raw_stats["total_records"]
+            if raw_stats["total_records"] else 0.0
+        )
+        if pass_rate < self.config.MIN_QUALITY_PASS_RATE:
+            failed_checks.append(
+                f"data_quality_flag_check ({pass_rate:.2f}% < {self.config.MIN_QUALITY_PASS_RATE}%)"
+            )
+
+        if failed_checks:
+            raise ValueError(f"Data quality checks failed: {', '.join(failed_checks)}")
+
+        logger.info(
+            f"Data quality checks passed: {fact_stats['total_facts']} facts, "
+            f"{pass_rate:.2f}% raw records passed"
+        )
+
     def create_fact_submissions(self, raw_financials_df: DataFrame) -> DataFrame:
         """Create submissions fact table (aggregated by filing).
 
@@ -159,20 +274,20 @@ class FactBuilder:
             F.col("cik_padded").alias("cik"),
             F.col("accession_number"),
             F.col("form"),
-            F.to_date(F.col("filed_date")).alias("filing_date"),
+            F.col("filed_date").alias("filing_date"),
             F.col("fiscal_year"),
             F.col("fiscal_period"),
         ).agg(
             F.countDistinct("concept").alias("concepts_reported"),
             F.count("*").alias("total_facts"),
-            F.sum(
-                F.when(F.col("statement_type") == "income_statement", 1).otherwise(0)
+            F.count(
+                F.when(F.col("statement_type") == "income_statement", True)
             ).alias("income_statement_facts"),
-            F.sum(
-                F.when(F.col("statement_type") == "balance_sheet", 1).otherwise(0)
+            F.count(
+                F.when(F.col("statement_type") == "balance_sheet", True)
             ).alias("balance_sheet_facts"),
-            F.sum(
-                F.when(F.col("statement_type") == "cash_flow", 1).otherwise(0)
+            F.count(
+                F.when(F.col("statement_type") == "cash_flow", True)
             ).alias("cash_flow_facts"),
         )
 
@@ -181,7 +296,6 @@ class FactBuilder:
             "created_at", F.current_timestamp()
         )
 
-        logger.info(f"Created fact_submissions with {fact_submissions.count()} records")
         return fact_submissions
 
 
@@ -199,8 +313,18 @@ def main(
     spark = SparkSession.builder \
         .appName("SEC-Create-Facts") \
         .config("spark.jars.packages", "com.google.cloud.spark:spark-bigquery-with-dependencies_2.12:0.32.2") \
+        .config("spark.sql.adaptive.enabled", "true") \
+        .config("spark.sql.adaptive.coalescePartitions.enabled", "true") \
+        .config("spark.sql.adaptive.advisoryPartitionSizeInBytes", "128MB") \
+        .config("spark.sql.adaptive.skewJoin.enabled", "true") \
+        .config("spark.sql.adaptive.skewJoin.skewedPartitionFactor", "5") \
+        .config("spark.sql.adaptive.skewJoin.skewedPartitionThresholdInBytes", "256MB") \
+        .config("spark.sql.optimizer.canChangeCachedPlanOutputPartitioning", "false") \
         .getOrCreate()
 
+    raw_financials_df = None
+    fact_financials = None
+
     try:
         # Initialize configuration
         config = SparkConfig()
@@ -208,11 +332,28 @@ def main(
         # Initialize builder
         builder = FactBuilder(spark, config)
 
-        # Read raw financials
-        raw_financials_df = builder.read_from_bigquery("raw_financials", bronze_dataset)
+        # Read raw financials once; both fact tables are built from it, so
+        # cache the projected columns rather than scanning BigQuery twice.
+        # Both builders group on keys that include the company, so hash
+        # partitioning by it up front lets their aggregates reuse the one
+        # shuffle instead of each exchanging the full table again. This
+        # relies on the cached plan keeping its output partitioning, which
+        # is why AQE may not change it (see the session config above).
+        raw_financials_df = builder.read_from_bigquery(
+            "raw_financials", bronze_dataset
+        ).select(
+            *FactBuilder.RAW_FINANCIALS_COLUMNS
+        ).repartition(
+            spark.sparkContext.defaultParallelism * 2, "cik_padded"
+        ).persist(StorageLevel.MEMORY_AND_DISK)
 
         # Create fact tables
-        fact_financials = builder.create_fact_financials(raw_financials_df)
+        # Validation and the write both read fact_financials; persist it so
+        # the dedup aggregate runs once rather than once per action
+        fact_financials = builder.create_fact_financials(
+            raw_financials_df
+        ).persist(StorageLevel.MEMORY_AND_DISK)
+        builder.validate_fact_financials(fact_financials, raw_financials_df)
         builder.write_to_bigquery(
             fact_financials,
             "fact_financials",
@@ -237,6 +378,10 @@ def main(
         raise
 
     finally:
+        if fact_financials is not None:
+            fact_financials.unpersist()
+        if raw_financials_df is not None:
+            raw_financials_df.unpersist()
         spark.stop()
 
 
@@ -25,19 +25,17 @@ CREATE TABLE IF NOT EXISTS `${PROJECT_ID}.bronze_sec.raw_financials` (
   company_name STRING OPTIONS(description="Company name"),
   concept STRING OPTIONS(description="US-GAAP concept name (e.g., Revenues, Assets)"),
   unit STRING OPTIONS(description="Unit of measure (USD, shares, pure)"),
-  end_date STRING OPTIONS(description="Period end date for the financial fact"),
+  end_date DATE OPTIONS(description="Period end date for the financial fact"),
   value FLOAT64 OPTIONS(description="Numeric value of the financial fact"),
   accession_number STRING OPTIONS(description="SEC filing accession number"),
   fiscal_year INT64 OPTIONS(description="Fiscal year of the filing"),
   fiscal_period STRING OPTIONS(description="Fiscal period (FY, Q1, Q2, Q3, Q4)"),
   form STRING OPTIONS(description="SEC form type (10-K, 10-Q, 8-K, etc.)"),
-  filed_date STRING OPTIONS(description="Date the filing was submitted to SEC"),
+  filed_date DATE OPTIONS(description="Date the filing was submitted to SEC"),
   frame STRING OPTIONS(description="Standardized time frame (e.g., CY2023Q1)"),
   statement_type STRING OPTIONS(description="Financial statement category (income_statement, balance_sheet, cash_flow, other)"),
   year_quarter STRING OPTIONS(description="Fiscal year and quarter combined (e.g., 2023-Q1)"),
-  has_null_critical BOOLEAN OPTIONS(description="Data quality flag: true if critical fields are null"),
-  invalid_fiscal_year BOOLEAN OPTIONS(description="Data quality flag: true if fiscal year is out of valid range"),
-  data_quality_passed BOOLEAN OPTIONS(description="Overall data quality flag: true if all checks passed"),
+  data_quality_passed BOOLEAN OPTIONS(description="Data quality flag: true if critical fields are present and the fiscal year is in range"),
   created_at TIMESTAMP OPTIONS(description="Record creation timestamp")
 )
 PARTITION BY fiscal_year
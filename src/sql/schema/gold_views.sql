@@ -9,7 +9,9 @@ CLUSTER BY cik
 OPTIONS(
   description="Pre-aggregated financial metrics for Looker dashboards - optimized for company analysis",
   enable_refresh=true,
-  refresh_interval_minutes=1440
+  refresh_interval_minutes=1440,
+  max_staleness=INTERVAL "1:0:0" HOUR TO SECOND,
+  allow_non_incremental_definition=true
 )
 AS
 WITH latest_facts AS (
@@ -85,7 +87,9 @@ CLUSTER BY cik
 OPTIONS(
   description="Calculated financial ratios for Looker dashboards - profitability, liquidity, leverage metrics",
   enable_refresh=true,
-  refresh_interval_minutes=1440
+  refresh_interval_minutes=1440,
+  max_staleness=INTERVAL "1:0:0" HOUR TO SECOND,
+  allow_non_incremental_definition=true
 )
 AS
 SELECT
@@ -144,7 +148,9 @@ CLUSTER BY sector
 OPTIONS(
   description="Peer comparison and industry benchmarks with percentile rankings",
   enable_refresh=true,
-  refresh_interval_minutes=1440
+  refresh_interval_minutes=1440,
+  max_staleness=INTERVAL "1:0:0" HOUR TO SECOND,
+  allow_non_incremental_definition=true
 )
 AS
 WITH company_ratios AS (
@@ -214,7 +220,9 @@ CLUSTER BY cik
 OPTIONS(
   description="Time-series metrics with trailing twelve months (TTM) and year-over-year growth",
   enable_refresh=true,
-  refresh_interval_minutes=1440
+  refresh_interval_minutes=1440,
+  max_staleness=INTERVAL "1:0:0" HOUR TO SECOND,
+  allow_non_incremental_definition=true
 )
 AS
 WITH quarterly_metrics AS (
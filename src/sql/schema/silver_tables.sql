@@ -12,7 +12,7 @@ CREATE TABLE IF NOT EXISTS `${PROJECT_ID}.silver_sec.dim_companies` (
   sector STRING OPTIONS(description="Business sector"),
   first_filing_year INT64 OPTIONS(description="Year of first SEC filing in dataset"),
   last_filing_year INT64 OPTIONS(description="Year of most recent SEC filing in dataset"),
-  total_filings INT64 OPTIONS(description="Total number of filings in dataset"),
+  total_filings INT64 OPTIONS(description="Approximate number of filings in dataset (about 2% error)"),
   created_at TIMESTAMP OPTIONS(description="Record creation timestamp"),
   updated_at TIMESTAMP OPTIONS(description="Record last update timestamp")
 )
@@ -30,7 +30,7 @@ CREATE TABLE IF NOT EXISTS `${PROJECT_ID}.silver_sec.dim_taxonomy` (
   data_type STRING OPTIONS(description="Data type (monetary, shares, percentage, pure)"),
   period_type STRING OPTIONS(description="Period type (instant or duration)"),
   balance_type STRING OPTIONS(description="Balance type (debit or credit)"),
-  companies_using INT64 OPTIONS(description="Number of companies reporting this concept"),
+  companies_using INT64 OPTIONS(description="Approximate number of companies reporting this concept (about 2% error)"),
   total_usage_count INT64 OPTIONS(description="Total number of times concept appears in dataset"),
   first_used_year INT64 OPTIONS(description="First fiscal year this concept was used"),
   last_used_year INT64 OPTIONS(description="Most recent fiscal year this concept was used"),
@@ -57,13 +57,13 @@ CREATE TABLE IF NOT EXISTS `${PROJECT_ID}.silver_sec.dim_dates` (
 )
 CLUSTER BY date
 OPTIONS(
-  description="Date dimension for time-based analysis",
+  description="Date dimension for time-based analysis, one row per calendar day since 1993-01-01",
   labels=[("layer", "silver"), ("type", "dimension")]
 );
 
 -- Fact Table: fact_financials
 CREATE TABLE IF NOT EXISTS `${PROJECT_ID}.silver_sec.fact_financials` (
-  fact_id STRING NOT NULL OPTIONS(description="Surrogate key (MD5 hash of cik+concept+end_date+accession)"),
+  fact_id STRING NOT NULL OPTIONS(description="Surrogate key (MD5 hash of cik|concept|end_date|accession)"),
   cik STRING NOT NULL OPTIONS(description="Company CIK (foreign key to dim_companies)"),
   concept STRING NOT NULL OPTIONS(description="US-GAAP concept (foreign key to dim_taxonomy)"),
   end_date DATE OPTIONS(description="Period end date (foreign key to dim_dates)"),
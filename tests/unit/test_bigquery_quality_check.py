@@ -0,0 +1,53 @@
+"""Unit tests for the pipeline's BigQuery data quality task."""
+
+import importlib
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+pytest.importorskip("airflow")
+pytest.importorskip("airflow.providers.google")
+
+DAGS_DIR = Path(__file__).resolve().parents[2] / "airflow" / "dags"
+
+# Airflow Variables the DAG's templates read
+TEST_VARIABLES = {
+    "gcp_project_id": "test-project",
+    "gcp_region": "us-central1",
+    "gcs_raw_bucket": "test-raw-bucket",
+    "gcs_processed_bucket": "test-processed-bucket",
+    "notification_email": "data@example.com",
+}
+
+
+@pytest.fixture(scope="module")
+def pipeline() -> Iterator[Any]:
+    """Import the pipeline DAG module the way Airflow loads the DAGs folder."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.syspath_prepend(str(DAGS_DIR))
+        yield importlib.import_module("sec_edgar_pipeline")
+    sys.modules.pop("sec_edgar_pipeline", None)
+
+
+class TestDataQualityTask:
+    """Test cases for the data quality checks in the pipeline DAG."""
+
+    def test_quality_check_sql_is_rendered(self, pipeline: Any) -> None:
+        """Test that Jinja in the check SQL is rendered before it runs."""
+        task = pipeline.dag.get_task("data_quality.run_data_quality_checks")
+
+        context = {
+            "var": {"value": TEST_VARIABLES},
+            "execution_date": datetime(2024, 1, 1),
+            "ds": "2024-01-01",
+        }
+        task.render_template_fields(context)
+
+        for check in task.quality_checks:
+            assert "{{" not in check["sql"]
+        assert "`test-project.region-us-central1.INFORMATION_SCHEMA" in (
+            task.quality_checks[0]["sql"]
+        )
@@ -0,0 +1,136 @@
+"""Unit tests for the Looker materialized view refresh operators."""
+
+import importlib
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+from unittest.mock import Mock, patch
+
+import pytest
+
+pytest.importorskip("airflow")
+pytest.importorskip("airflow.providers.google")
+
+DAGS_DIR = Path(__file__).resolve().parents[2] / "airflow" / "dags"
+
+NOW = datetime.now(timezone.utc)
+
+VIEWS = ["looker_company_metrics", "looker_financial_ratios", "looker_timeseries"]
+
+BASE_TABLES = {
+    "looker_company_metrics": ["silver_sec.fact_financials"],
+    "looker_financial_ratios": ["gold_sec.looker_company_metrics"],
+    "looker_timeseries": ["gold_sec.looker_company_metrics"],
+}
+
+
+@pytest.fixture(scope="module")
+def looker_refresh() -> Iterator[Any]:
+    """Import the operator module the way Airflow loads the DAGs folder."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.syspath_prepend(str(DAGS_DIR))
+        yield importlib.import_module("operators.looker_refresh")
+    for name in [name for name in sys.modules if name.startswith("operators")]:
+        sys.modules.pop(name)
+
+
+def _client(rows: List[Dict[str, Any]]) -> Mock:
+    """Create a BigQuery client stand-in whose queries return the rows."""
+    client = Mock()
+    client.query.return_value.result.return_value = rows
+    return client
+
+
+def _freshness_rows(
+    last_refresh: datetime,
+    fact_modified: datetime,
+) -> List[Dict[str, Any]]:
+    """Build freshness rows where only fact_financials' time varies."""
+    return [
+        {"kind": "view", "table_id": view_id, "modified_time": last_refresh}
+        for view_id in VIEWS
+    ] + [
+        {"kind": "base", "table_id": "silver_sec.fact_financials", "modified_time": fact_modified},
+        {"kind": "base", "table_id": "gold_sec.looker_company_metrics", "modified_time": last_refresh},
+    ]
+
+
+class TestFindStaleViews:
+    """Test cases for the shared view freshness check."""
+
+    def test_all_fresh(self, looker_refresh: Any) -> None:
+        """Test that views refreshed after their inputs changed are fresh."""
+        client = _client(_freshness_rows(NOW - timedelta(minutes=5), NOW - timedelta(minutes=10)))
+
+        stale = looker_refresh.find_stale_views(
+            client, "p", "gold_sec", "us-central1", VIEWS, BASE_TABLES, timedelta(hours=1)
+        )
+
+        assert stale == []
+        client.query.assert_called_once()
+
+    def test_stale_base_cascades(self, looker_refresh: Any) -> None:
+        """Test that refreshing a view also refreshes the views built on it."""
+        client = _client(_freshness_rows(NOW - timedelta(minutes=10), NOW - timedelta(minutes=5)))
+
+        stale = looker_refresh.find_stale_views(
+            client, "p", "gold_sec", "us-central1", VIEWS, BASE_TABLES, timedelta(hours=1)
+        )
+
+        assert stale == VIEWS
+
+    def test_old_refresh_is_stale(self, looker_refresh: Any) -> None:
+        """Test that views refreshed longer than max_staleness ago are stale."""
+        client = _client(_freshness_rows(NOW - timedelta(hours=2), NOW - timedelta(hours=3)))
+
+        stale = looker_refresh.find_stale_views(
+            client, "p", "gold_sec", "us-central1", VIEWS, BASE_TABLES, timedelta(hours=1)
+        )
+
+        assert stale == VIEWS
+
+    def test_view_without_base_tables_is_stale(self, looker_refresh: Any) -> None:
+        """Test that a view with unknown inputs is never fresh."""
+        client = _client(_freshness_rows(NOW - timedelta(minutes=5), NOW - timedelta(minutes=10)))
+
+        stale = looker_refresh.find_stale_views(
+            client, "p", "gold_sec", "us-central1", VIEWS[:1], {}, timedelta(hours=1)
+        )
+
+        assert stale == VIEWS[:1]
+
+
+class TestBatchRefresh:
+    """Test cases for LookerMaterializedViewBatchRefreshOperator."""
+
+    def test_refreshes_only_stale_views(self, looker_refresh: Any) -> None:
+        """Test that the refresh script calls only the stale views."""
+        client = _client([])
+        operator = looker_refresh.LookerMaterializedViewBatchRefreshOperator(
+            task_id="refresh", project_id="p", dataset_id="gold_sec",
+            views=VIEWS, base_tables=BASE_TABLES,
+        )
+
+        with patch.object(looker_refresh, "get_bigquery_client", return_value=client), \
+                patch.object(looker_refresh, "find_stale_views", return_value=["looker_timeseries"]):
+            result = operator.execute({})
+
+        refresh_script = client.query.call_args_list[0].args[0]
+        assert refresh_script == "CALL BQ.REFRESH_MATERIALIZED_VIEW('p.gold_sec.looker_timeseries');"
+        assert result["refresh_status"] == "success"
+
+    def test_skips_job_when_all_fresh(self, looker_refresh: Any) -> None:
+        """Test that no refresh job runs when every view is fresh."""
+        client = _client([])
+        operator = looker_refresh.LookerMaterializedViewBatchRefreshOperator(
+            task_id="refresh", project_id="p", dataset_id="gold_sec",
+            views=VIEWS, base_tables=BASE_TABLES,
+        )
+
+        with patch.object(looker_refresh, "get_bigquery_client", return_value=client), \
+                patch.object(looker_refresh, "find_stale_views", return_value=[]):
+            result = operator.execute({})
+
+        assert result == {"views": [], "refresh_status": "skipped"}
+        client.query.assert_not_called()
@@ -1,6 +1,9 @@
 """Unit tests for RateLimiter."""
 
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from src.ingestion.rate_limiter import RateLimiter
 
@@ -13,7 +16,7 @@ class TestRateLimiter:
         limiter = RateLimiter(requests_per_second=10)
         assert limiter.requests_per_second == 10
         assert limiter.time_window == 1.0
-        assert len(limiter.request_times) == 0
+        assert limiter.tokens == limiter.capacity
 
     def test_acquire_single_request(self) -> None:
         """Test acquiring permission for a single request."""
@@ -23,7 +26,7 @@ class TestRateLimiter:
         elapsed = time.time() - start
 
         assert elapsed < 0.1  # Should be nearly instant
-        assert len(limiter.request_times) == 1
+        assert limiter.tokens < limiter.capacity
 
     def test_rate_limiting_enforced(self) -> None:
         """Test that rate limiting is actually enforced."""
@@ -63,29 +66,29 @@ class TestRateLimiter:
         for _ in range(5):
             limiter.acquire()
 
-        assert len(limiter.request_times) == 5
+        assert limiter.get_current_rate() > 0
 
         # Reset
         limiter.reset()
 
-        assert len(limiter.request_times) == 0
+        assert limiter.tokens == limiter.capacity
         assert limiter.get_current_rate() == 0.0
 
     def test_time_window_cleanup(self) -> None:
-        """Test that old requests are removed from the window."""
+        """Test that the bucket refills once the time window has passed."""
         limiter = RateLimiter(requests_per_second=10)
 
         # Make a request
         limiter.acquire()
-        assert len(limiter.request_times) == 1
+        assert limiter.get_current_rate() > 0
 
         # Wait for time window to pass
         time.sleep(1.1)
 
-        # Check rate (should trigger cleanup)
+        # Check rate (should trigger refill)
         rate = limiter.get_current_rate()
         assert rate == 0.0
-        assert len(limiter.request_times) == 0
+        assert limiter.tokens == limiter.capacity
 
     def test_burst_handling(self) -> None:
         """Test handling of burst requests."""
@@ -101,3 +104,63 @@ class TestRateLimiter:
 
         # Should take at least 2 seconds (5 requests at 2 req/s)
         assert elapsed >= 2.0
+
+    def test_concurrent_acquire(self) -> None:
+        """Test that concurrent callers share the rate limit."""
+        limiter = RateLimiter(requests_per_second=10)
+
+        start = time.time()
+
+        # 11 requests from several threads need 10 refill intervals
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for _ in range(11):
+                executor.submit(limiter.acquire)
+
+        elapsed = time.time() - start
+
+        assert elapsed >= 1.0
+
+    def test_burst_capacity(self) -> None:
+        """Test that a larger bucket admits a burst without waiting."""
+        limiter = RateLimiter(requests_per_second=2, burst=5)
+
+        start = time.time()
+
+        for _ in range(5):
+            limiter.acquire()
+
+        elapsed = time.time() - start
+
+        assert elapsed < 0.1
+
+        # The bucket is now empty, so the next request waits for a refill
+        start = time.time()
+        limiter.acquire()
+        assert time.time() - start >= 0.4
+
+    def test_reset_wakes_waiting_callers(self) -> None:
+        """Test that reset releases a caller waiting for a token."""
+        limiter = RateLimiter(requests_per_second=1)
+        limiter.acquire()
+
+        start = time.time()
+        waiter = threading.Thread(target=limiter.acquire)
+        waiter.start()
+
+        time.sleep(0.1)
+        limiter.reset()
+        waiter.join(timeout=2.0)
+
+        assert not waiter.is_alive()
+        assert time.time() - start < 0.5
+
+    def test_invalid_burst_raises_error(self) -> None:
+        """Test that a burst below one request is rejected."""
+        with pytest.raises(ValueError, match="burst must be at least 1"):
+            RateLimiter(requests_per_second=10, burst=0)
+
+    @pytest.mark.parametrize("requests_per_second", [0, -1])
+    def test_invalid_rate_raises_error(self, requests_per_second: int) -> None:
+        """Test that a non-positive request rate is rejected."""
+        with pytest.raises(ValueError, match="requests_per_second must be positive"):
+            RateLimiter(requests_per_second=requests_per_second)
@@ -1,220 +1,500 @@
 """Unit tests for SECDownloader."""
 
+import copy
+from types import SimpleNamespace
+from typing import Iterator
+
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from src.ingestion.sec_downloader import SECDownloader, SECDownloadError
+import requests
+from google.api_core import exceptions as google_exceptions
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+from unittest.mock import ANY, Mock, create_autospec, patch
+from src.ingestion.sec_downloader import (
+    SECDownloader,
+    _get_storage_client,
+    SECDownloadError,
+    STREAM_CHUNK_SIZE,
+    LARGE_FILE_CHUNK_SIZE,
+    READ_CHUNK_SIZE,
+    DEFAULT_RETRY_AFTER_SECONDS,
+    KEEPALIVE_SOCKET_OPTIONS,
+    _wait_before_retry,
+    retry_after_seconds,
+    upload_chunk_size,
+)
 from src.ingestion.config import SECConfig
 
 
+# Keep the module on one xdist worker so its module-scoped fixtures are
+# built once rather than on every worker
+pytestmark = pytest.mark.xdist_group("sec_downloader")
+
+TEST_URL = "https://test.url/file.zip"
+TEST_GCS_PATH = "bulk/test.zip"
+TEST_PAYLOAD = b"test content"
+
+# Environment read by SECConfig
+TEST_ENV = {
+    "SEC_USER_AGENT": "TestCompany test@example.com",
+    "GCP_PROJECT_ID": "test-project",
+    "GCS_RAW_BUCKET": "test-bucket",
+}
+
+
+def _mock_response() -> Mock:
+    """Create a mock HTTP response usable as a context manager."""
+    response = Mock()
+    response.__enter__ = Mock(return_value=response)
+    response.__exit__ = Mock(return_value=False)
+    return response
+
+
+@pytest.fixture(scope="module")
+def mock_config() -> Iterator[SECConfig]:
+    """Create a mock SEC configuration shared by the module's tests.
+
+    SECConfig is frozen, so one instance can safely be reused. The built-in
+    monkeypatch fixture is function-scoped, hence the manual MonkeyPatch.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        for name, value in TEST_ENV.items():
+            mp.setenv(name, value)
+        yield SECConfig()
+
+
+@pytest.fixture(autouse=True)
+def no_retry_wait(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Skip the backoff sleeps between download retries."""
+    for method in (SECDownloader._download_file, SECDownloader._stream_to_gcs):
+        monkeypatch.setattr(method.retry, "sleep", lambda seconds: None)
+
+
+@pytest.fixture(autouse=True)
+def clear_storage_client_cache() -> None:
+    """Drop cached storage clients so each test sees its own mock."""
+    _get_storage_client.cache_clear()
+
+
+@pytest.fixture
+def mock_blob() -> Mock:
+    """Create a mock GCS blob, the only storage object tests assert on."""
+    return Mock(spec=["metadata", "upload_from_string", "upload_from_file"])
+
+
 @pytest.fixture
-def mock_config(monkeypatch: pytest.MonkeyPatch) -> SECConfig:
-    """Create a mock SEC configuration for testing."""
-    monkeypatch.setenv("SEC_USER_AGENT", "TestCompany test@example.com")
-    monkeypatch.setenv("GCP_PROJECT_ID", "test-project")
-    monkeypatch.setenv("GCS_RAW_BUCKET", "test-bucket")
-    return SECConfig()
+def mock_bucket(mock_blob: Mock) -> SimpleNamespace:
+    """Create a GCS bucket stand-in that hands out the mock blob."""
+    return SimpleNamespace(
+        blob=Mock(return_value=mock_blob),
+        get_blob=Mock(return_value=None),
+    )
 
 
 @pytest.fixture
-def mock_storage_client() -> Mock:
-    """Create a mock GCS storage client."""
-    mock_client = Mock()
-    mock_bucket = Mock()
-    mock_blob = Mock()
+def mock_storage_client(mock_bucket: SimpleNamespace) -> SimpleNamespace:
+    """Create a GCS client stand-in that hands out the mock bucket."""
+    return SimpleNamespace(bucket=lambda name: mock_bucket)
+
+
+@pytest.fixture(autouse=True)
+def mock_storage_class(mock_storage_client: SimpleNamespace) -> Iterator[Mock]:
+    """Patch storage.Client to return the mock client for every test."""
+    with patch(
+        "src.ingestion.sec_downloader.storage.Client",
+        return_value=mock_storage_client,
+    ) as mock_class:
+        yield mock_class
+
+
+@pytest.fixture(autouse=True)
+def mock_session() -> Iterator[Mock]:
+    """Patch requests.Session so no test builds a real HTTP session.
+
+    Yields the session instance every downloader in the test receives.
+    """
+    with patch(
+        "src.ingestion.sec_downloader.requests.Session", new_callable=Mock
+    ) as mock_class:
+        yield mock_class.return_value
+
+
+@pytest.fixture(scope="module")
+def base_downloader(mock_config: SECConfig) -> SECDownloader:
+    """Construct one downloader for the module's tests to clone."""
+    with patch("src.ingestion.sec_downloader.storage.Client"), \
+            patch("src.ingestion.sec_downloader.requests.Session"):
+        downloader = SECDownloader(mock_config)
+    _get_storage_client.cache_clear()
+    return downloader
 
-    mock_client.bucket.return_value = mock_bucket
-    mock_bucket.blob.return_value = mock_blob
 
-    return mock_client
+@pytest.fixture
+def downloader(
+    base_downloader: SECDownloader,
+    mock_storage_client: SimpleNamespace,
+    mock_bucket: SimpleNamespace,
+    mock_session: Mock,
+) -> SECDownloader:
+    """Shallow copy of the shared downloader wired to this test's mocks.
+
+    Tests may replace methods on the copy without touching the original.
+    """
+    clone = copy.copy(base_downloader)
+    clone.storage_client = mock_storage_client
+    clone.bucket = mock_bucket
+    clone.session = mock_session
+    return clone
 
 
 class TestSECDownloader:
     """Test cases for SECDownloader class."""
 
-    @patch("src.ingestion.sec_downloader.storage.Client")
     def test_initialization(
         self,
-        mock_storage_class: Mock,
         mock_config: SECConfig,
-        mock_storage_client: Mock,
+        mock_session: Mock,
     ) -> None:
         """Test downloader initialization."""
-        mock_storage_class.return_value = mock_storage_client
-
         downloader = SECDownloader(mock_config)
 
         assert downloader.config == mock_config
         assert downloader.rate_limiter is not None
-        assert downloader.session.headers["User-Agent"] == mock_config.USER_AGENT
+        assert downloader.session is mock_session
 
-    @patch("src.ingestion.sec_downloader.storage.Client")
-    @patch("src.ingestion.sec_downloader.requests.Session")
-    def test_download_file_success(
+        headers = mock_session.headers.update.call_args.args[0]
+        assert headers["User-Agent"] == mock_config.USER_AGENT
+
+        mock_session.mount.assert_any_call("https://", ANY)
+        adapter = mock_session.mount.call_args.args[1]
+        assert adapter.max_retries.total == 3
+        # Status codes are retried by tenacity only, not by urllib3 as well
+        assert not adapter.max_retries.status_forcelist
+        assert adapter.max_retries.raise_on_status is False
+        assert adapter.poolmanager.connection_pool_kw["socket_options"] == KEEPALIVE_SOCKET_OPTIONS
+        assert adapter.poolmanager.connection_pool_kw["block"] is True
+
+    def test_storage_client_shared(
         self,
-        mock_session_class: Mock,
         mock_storage_class: Mock,
         mock_config: SECConfig,
-        mock_storage_client: Mock,
     ) -> None:
-        """Test successful file download."""
-        # Setup mocks
-        mock_storage_class.return_value = mock_storage_client
+        """Test downloaders reuse one storage client per project."""
+        first = SECDownloader(mock_config)
+        second = SECDownloader(mock_config)
 
-        mock_response = Mock()
-        mock_response.content = b"test content"
-        mock_response.status_code = 200
+        assert first.storage_client is second.storage_client
+        mock_storage_class.assert_called_once()
 
-        mock_session = Mock()
+    def test_download_file_success(
+        self,
+        mock_config: SECConfig,
+        mock_session: Mock,
+    ) -> None:
+        """Test successful file download."""
+        mock_response = _mock_response()
+        mock_response.iter_content.return_value = [TEST_PAYLOAD[:5], TEST_PAYLOAD[5:]]
+        mock_response.status_code = 200
         mock_session.get.return_value = mock_response
-        mock_session.headers = {}
-        mock_session_class.return_value = mock_session
 
-        # Create downloader and patch session
         downloader = SECDownloader(mock_config)
-        downloader.session = mock_session
 
         # Download file
-        content = downloader._download_file("https://test.url/file.zip")
+        content = downloader._download_file(TEST_URL)
 
-        assert content == b"test content"
+        assert content == TEST_PAYLOAD
         mock_session.get.assert_called_once()
+        mock_response.iter_content.assert_called_once_with(chunk_size=READ_CHUNK_SIZE)
 
-    @patch("src.ingestion.sec_downloader.storage.Client")
-    @patch("src.ingestion.sec_downloader.requests.Session")
     def test_download_file_http_error(
         self,
-        mock_session_class: Mock,
-        mock_storage_class: Mock,
         mock_config: SECConfig,
-        mock_storage_client: Mock,
+        mock_session: Mock,
     ) -> None:
-        """Test file download with HTTP error."""
-        # Setup mocks
-        mock_storage_class.return_value = mock_storage_client
-
+        """Test file download with a server error on every attempt."""
         mock_response = Mock()
-        mock_response.status_code = 404
-        mock_response.raise_for_status.side_effect = Exception("HTTP 404")
-
-        mock_session = Mock()
+        mock_response.status_code = 503
+        mock_response.raise_for_status.side_effect = requests.HTTPError(
+            "503 Service Unavailable", response=mock_response
+        )
         mock_session.get.return_value = mock_response
-        mock_session.headers = {}
-        mock_session_class.return_value = mock_session
 
-        # Create downloader
         downloader = SECDownloader(mock_config)
-        downloader.session = mock_session
 
-        # Should raise SECDownloadError after retries
-        with pytest.raises(Exception):
-            downloader._download_file("https://test.url/file.zip")
+        # Should raise SECDownloadError after retries, without waiting
+        with pytest.raises(SECDownloadError, match="Server error"):
+            downloader._download_file(TEST_URL)
 
-    @patch("src.ingestion.sec_downloader.storage.Client")
-    def test_upload_to_gcs(
+        assert mock_session.get.call_count == 5
+
+    def test_download_file_client_error_not_retried(
         self,
-        mock_storage_class: Mock,
         mock_config: SECConfig,
-        mock_storage_client: Mock,
     ) -> None:
-        """Test uploading content to GCS."""
-        mock_storage_class.return_value = mock_storage_client
-        mock_blob = Mock()
-        mock_storage_client.bucket.return_value.blob.return_value = mock_blob
+        """Test that a 4xx other than 429 fails without retrying."""
+        mock_response = Mock()
+        mock_response.status_code = 404
+        mock_response.raise_for_status.side_effect = requests.HTTPError(
+            "404 Not Found", response=mock_response
+        )
 
         downloader = SECDownloader(mock_config)
+        downloader.session.get.return_value = mock_response
 
-        content = b"test content"
-        path = "bulk/test.zip"
+        with pytest.raises(SECDownloadError, match="HTTP error") as exc_info:
+            downloader._download_file(TEST_URL)
+
+        assert exc_info.value.retryable is False
+        downloader.session.get.assert_called_once()
+
+    def test_upload_to_gcs(
+        self,
+        downloader: SECDownloader,
+        mock_blob: Mock,
+    ) -> None:
+        """Test uploading content to GCS."""
         metadata = {"source": "test"}
 
-        downloader._upload_to_gcs(content, path, metadata)
+        downloader._upload_to_gcs(TEST_PAYLOAD, TEST_GCS_PATH, metadata)
 
-        mock_blob.upload_from_string.assert_called_once_with(content)
+        mock_blob.upload_from_string.assert_called_once_with(TEST_PAYLOAD)
         assert mock_blob.metadata == metadata
 
-    @patch("src.ingestion.sec_downloader.storage.Client")
-    def test_download_companyfacts(
+    def test_stream_to_gcs(
         self,
-        mock_storage_class: Mock,
         mock_config: SECConfig,
-        mock_storage_client: Mock,
+        mock_bucket: SimpleNamespace,
+        mock_blob: Mock,
     ) -> None:
-        """Test downloading companyfacts file."""
-        mock_storage_class.return_value = mock_storage_client
+        """Test piping a download directly into a GCS upload."""
+        mock_response = _mock_response()
+        mock_response.status_code = 200
+        mock_response.headers = {}
 
-        downloader = SECDownloader(mock_config)
+        downloader = SECDownloader(mock_config, stream=True)
+        downloader.session.get.return_value = mock_response
 
-        # Mock the download and upload methods
-        downloader._download_file = Mock(return_value=b"companyfacts data")
-        downloader._upload_to_gcs = Mock()
+        metadata = {"source": "test"}
+        downloader._stream_to_gcs(TEST_URL, TEST_GCS_PATH, metadata)
+
+        mock_bucket.blob.assert_called_once_with(
+            TEST_GCS_PATH, chunk_size=STREAM_CHUNK_SIZE
+        )
+        mock_blob.upload_from_file.assert_called_once_with(mock_response.raw, rewind=False)
+        assert mock_response.raw.decode_content is True
+        assert mock_blob.metadata == metadata
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            ProtocolError("Connection broken: ConnectionResetError(104)"),
+            ReadTimeoutError(None, TEST_URL, "Read timed out."),
+            ConnectionResetError(104, "Connection reset by peer"),
+            google_exceptions.ServiceUnavailable("Backend error"),
+        ],
+    )
+    def test_stream_to_gcs_retries_mid_stream_failure(
+        self,
+        error: Exception,
+        mock_config: SECConfig,
+        mock_blob: Mock,
+    ) -> None:
+        """Test that a connection lost during a streamed upload is retried."""
+        mock_response = _mock_response()
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_blob.upload_from_file.side_effect = [error, None]
+
+        downloader = SECDownloader(mock_config, stream=True)
+        downloader.session.get.return_value = mock_response
+
+        downloader._stream_to_gcs(TEST_URL, TEST_GCS_PATH)
+
+        assert downloader.session.get.call_count == 2
+        assert mock_blob.upload_from_file.call_count == 2
+
+    def test_stream_to_gcs_upload_denied_not_retried(
+        self,
+        mock_config: SECConfig,
+        mock_blob: Mock,
+    ) -> None:
+        """Test that a permanent GCS error fails without retrying."""
+        mock_response = _mock_response()
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_blob.upload_from_file.side_effect = google_exceptions.Forbidden("denied")
+
+        downloader = SECDownloader(mock_config, stream=True)
+        downloader.session.get.return_value = mock_response
+
+        with pytest.raises(google_exceptions.Forbidden):
+            downloader._stream_to_gcs(TEST_URL, TEST_GCS_PATH)
+
+        downloader.session.get.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "content_length, expected",
+        [
+            (None, STREAM_CHUNK_SIZE),
+            (1000, 256 * 1024),
+            (256 * 1024, 512 * 1024),
+            (32 * 1024 * 1024, STREAM_CHUNK_SIZE),
+            (2 * 1024 * 1024 * 1024, LARGE_FILE_CHUNK_SIZE),
+        ],
+    )
+    def test_upload_chunk_size(self, content_length: int, expected: int) -> None:
+        """Test chunk sizes scale with the download size."""
+        chunk_size = upload_chunk_size(content_length)
+
+        assert chunk_size == expected
+        assert chunk_size % (256 * 1024) == 0
+
+    def test_rate_limit_waits_for_retry_after(
+        self,
+        mock_config: SECConfig,
+        mock_session: Mock,
+    ) -> None:
+        """Test that a 429 is retried after the server's Retry-After delay."""
+        limited = Mock()
+        limited.status_code = 429
+        limited.headers = {"Retry-After": "7"}
+        limited.raise_for_status.side_effect = requests.HTTPError(
+            "429 Too Many Requests", response=limited
+        )
+        ok = _mock_response()
+        ok.iter_content.return_value = [TEST_PAYLOAD]
+        mock_session.get.side_effect = [limited, ok]
+
+        sleeps = []
+        with patch.object(SECDownloader._download_file.retry, "sleep", sleeps.append):
+            content = SECDownloader(mock_config)._download_file(TEST_URL)
+
+        assert content == TEST_PAYLOAD
+        assert len(sleeps) == 1
+        assert 7.0 <= sleeps[0] <= 10.5
+
+    def test_wait_before_retry(self) -> None:
+        """Test the retry wait honors Retry-After and otherwise backs off."""
+        def state(exc: BaseException) -> SimpleNamespace:
+            return SimpleNamespace(
+                outcome=SimpleNamespace(exception=lambda: exc), attempt_number=1
+            )
+
+        rate_limited = SECDownloadError("429", retry_after=30.0)
+        assert 30.0 <= _wait_before_retry(state(rate_limited)) <= 45.0
+
+        server_error = SECDownloadError("503")
+        assert 0.0 <= _wait_before_retry(state(server_error)) <= 60.0
+
+    def test_retry_after_seconds(self) -> None:
+        """Test parsing Retry-After as delta-seconds or an HTTP-date."""
+        assert retry_after_seconds("5") == 5.0
+        assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert retry_after_seconds(None) == DEFAULT_RETRY_AFTER_SECONDS
+        assert retry_after_seconds("soon") == DEFAULT_RETRY_AFTER_SECONDS
+
+    def test_download_companyfacts_streaming(
+        self,
+        downloader: SECDownloader,
+    ) -> None:
+        """Test that downloads stream to GCS by default."""
+        downloader._source_etag = create_autospec(
+            downloader._source_etag, return_value=None
+        )
+        downloader._download_file = create_autospec(downloader._download_file)
+        downloader._stream_to_gcs = create_autospec(downloader._stream_to_gcs)
 
         result = downloader.download_companyfacts(2023)
 
-        assert "companyfacts.zip" in result
-        assert "gs://" in result
-        downloader._download_file.assert_called_once()
-        downloader._upload_to_gcs.assert_called_once()
+        assert result.endswith("bulk/2023/companyfacts.zip")
+        downloader._stream_to_gcs.assert_called_once()
+        downloader._download_file.assert_not_called()
 
-    @patch("src.ingestion.sec_downloader.storage.Client")
-    def test_download_submissions(
+    def test_download_companyfacts_unchanged(
         self,
-        mock_storage_class: Mock,
         mock_config: SECConfig,
-        mock_storage_client: Mock,
+        mock_bucket: SimpleNamespace,
     ) -> None:
-        """Test downloading submissions file."""
-        mock_storage_class.return_value = mock_storage_client
+        """Test that a file whose ETag matches the stored copy is skipped."""
+        mock_bucket.get_blob.return_value = SimpleNamespace(
+            metadata={"source_etag": '"abc123"'}
+        )
 
         downloader = SECDownloader(mock_config)
+        downloader.session.head.return_value.headers = {"ETag": '"abc123"'}
+        downloader._stream_to_gcs = create_autospec(downloader._stream_to_gcs)
+
+        result = downloader.download_companyfacts(2023)
+
+        assert result.endswith("bulk/2023/companyfacts.zip")
+        downloader._stream_to_gcs.assert_not_called()
+
+        # A new version is downloaded and tagged with its ETag
+        downloader.session.head.return_value.headers = {"ETag": '"def456"'}
+
+        downloader.download_companyfacts(2023)
+
+        metadata = downloader._stream_to_gcs.call_args.args[2]
+        assert metadata["source_etag"] == '"def456"'
+
+    @pytest.mark.parametrize(
+        "method, filename",
+        [
+            ("download_companyfacts", "companyfacts.zip"),
+            ("download_submissions", "submissions.zip"),
+        ],
+    )
+    def test_download_bulk_file(
+        self,
+        method: str,
+        filename: str,
+        downloader: SECDownloader,
+    ) -> None:
+        """Test downloading each bulk file through the buffered path."""
+        downloader.stream = False
 
         # Mock the download and upload methods
-        downloader._download_file = Mock(return_value=b"submissions data")
-        downloader._upload_to_gcs = Mock()
+        downloader._source_etag = create_autospec(
+            downloader._source_etag, return_value=None
+        )
+        downloader._download_file = create_autospec(
+            downloader._download_file, return_value=TEST_PAYLOAD
+        )
+        downloader._upload_to_gcs = create_autospec(downloader._upload_to_gcs)
 
-        result = downloader.download_submissions(2023)
+        result = getattr(downloader, method)(2023)
 
-        assert "submissions.zip" in result
+        assert filename in result
         assert "gs://" in result
         downloader._download_file.assert_called_once()
         downloader._upload_to_gcs.assert_called_once()
 
-    @patch("src.ingestion.sec_downloader.storage.Client")
     def test_download_all_bulk_files(
         self,
-        mock_storage_class: Mock,
-        mock_config: SECConfig,
-        mock_storage_client: Mock,
+        downloader: SECDownloader,
     ) -> None:
         """Test downloading all bulk files."""
-        mock_storage_class.return_value = mock_storage_client
-
-        downloader = SECDownloader(mock_config)
-
         # Mock the individual download methods
-        downloader.download_companyfacts = Mock(return_value="gs://bucket/companyfacts.zip")
-        downloader.download_submissions = Mock(return_value="gs://bucket/submissions.zip")
+        downloader.download_companyfacts = create_autospec(
+            downloader.download_companyfacts, return_value="gs://bucket/companyfacts.zip"
+        )
+        downloader.download_submissions = create_autospec(
+            downloader.download_submissions, return_value="gs://bucket/submissions.zip"
+        )
 
         results = downloader.download_all_bulk_files(2023)
 
         assert len(results) == 2
         assert "companyfacts" in results
         assert "submissions" in results
-        downloader.download_companyfacts.assert_called_once_with(2023)
-        downloader.download_submissions.assert_called_once_with(2023)
+        run_ts = downloader.download_companyfacts.call_args.args[1]
+        downloader.download_companyfacts.assert_called_once_with(2023, run_ts)
+        downloader.download_submissions.assert_called_once_with(2023, run_ts)
 
-    @patch("src.ingestion.sec_downloader.storage.Client")
     def test_close(
         self,
-        mock_storage_class: Mock,
-        mock_config: SECConfig,
-        mock_storage_client: Mock,
+        downloader: SECDownloader,
     ) -> None:
         """Test closing the downloader."""
-        mock_storage_class.return_value = mock_storage_client
-
-        downloader = SECDownloader(mock_config)
-        downloader.session = Mock()
-
         downloader.close()
 
         downloader.session.close.assert_called_once()